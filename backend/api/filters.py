@@ -1,19 +1,71 @@
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            TrigramSimilarity)
+from django.db.models import Exists, F, OuterRef, Q
 from django_filters import rest_framework as filters
 from recipes.models import Ingredient, Recipe
+from recipes.tags import get_tag_ids
+from rest_framework.filters import OrderingFilter
+
+TAGS_MATCH_ANY = 'any'
+TAGS_MATCH_ALL = 'all'
+
+
+def tag_choices():
+    """Возвращает варианты тегов из закешированного словаря slug -> id."""
+    return [(slug, slug) for slug in sorted(get_tag_ids())]
 
 
 class RecipeFilter(filters.FilterSet):
-    """Фильтр для рецептов."""
+    """
+    Фильтр для рецептов.
 
-    tags = filters.AllValuesMultipleFilter(field_name='tags__slug')
+    Теги проверяются по словарю из памяти процесса и фильтруются
+    подзапросом EXISTS к промежуточной таблице, поэтому рецепты
+    не дублируются и DISTINCT не нужен. По умолчанию рецепт подходит,
+    если у него есть любой из тегов, а при tags_match=all — все теги.
+    """
+
+    tags = filters.MultipleChoiceFilter(
+        choices=tag_choices, method='filter_tags'
+    )
+    tags_match = filters.ChoiceFilter(
+        choices=((TAGS_MATCH_ANY, TAGS_MATCH_ANY),
+                 (TAGS_MATCH_ALL, TAGS_MATCH_ALL)),
+        method='filter_tags_match'
+    )
     author = filters.NumberFilter(field_name='author__id')
     is_favorited = filters.BooleanFilter(method='filter_is_favorited')
     is_in_shopping_cart = filters.BooleanFilter(
         method='filter_is_in_shopping_cart')
+    search = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Recipe
-        fields = ('author', 'tags', 'is_favorited', 'is_in_shopping_cart')
+        fields = (
+            'author', 'tags', 'tags_match', 'is_favorited',
+            'is_in_shopping_cart', 'search'
+        )
+
+    def filter_tags(self, queryset, name, value):
+        """Фильтрация по slug тегов через EXISTS без JOIN и DISTINCT."""
+        tag_ids = get_tag_ids()
+        ids = sorted({tag_ids[slug] for slug in value if slug in tag_ids})
+        if not ids:
+            return queryset.none()
+        recipe_tags = Recipe.tags.through.objects.filter(
+            recipe_id=OuterRef('pk')
+        )
+        if self.form.cleaned_data.get('tags_match') == TAGS_MATCH_ALL:
+            for tag_id in ids:
+                queryset = queryset.filter(
+                    Exists(recipe_tags.filter(tag_id=tag_id))
+                )
+            return queryset
+        return queryset.filter(Exists(recipe_tags.filter(tag_id__in=ids)))
+
+    def filter_tags_match(self, queryset, name, value):
+        """Режим сопоставления тегов учитывается в filter_tags."""
+        return queryset
 
     def filter_is_favorited(self, queryset, name, value):
         """Фильтрация по наличию рецепта в избранном."""
@@ -29,6 +81,38 @@ class RecipeFilter(filters.FilterSet):
             return queryset.filter(shoppingcart_by__user=user)
         return queryset
 
+    def filter_search(self, queryset, name, value):
+        """
+        Полнотекстовый поиск по названию и описанию рецепта.
+
+        Совпадения по триграммам названия добавляются к результатам,
+        чтобы находить рецепты при опечатках. Релевантность сохраняется
+        в аннотации search_rank.
+        """
+        value = value.strip()
+        if not value:
+            return queryset
+        query = SearchQuery(value, config='russian', search_type='websearch')
+        return queryset.filter(
+            Q(search_vector=query) | Q(name__trigram_similar=value)
+        ).annotate(
+            search_rank=(
+                SearchRank(F('search_vector'), query)
+                + TrigramSimilarity('name', value)
+            )
+        )
+
+
+class RecipeOrderingFilter(OrderingFilter):
+    """Сортировка рецептов с приоритетом релевантности при поиске."""
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if (request.query_params.get(self.ordering_param)
+                or 'search_rank' not in queryset.query.annotations):
+            return ordering
+        return ('-search_rank', *ordering)
+
 
 class IngredientFilter(filters.FilterSet):
     """Фильтр для поиска ингредиентов."""
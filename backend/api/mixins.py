@@ -1,4 +1,16 @@
+import hashlib
+
+from api.serializers import RecipeIdsSerializer
+from core import metrics
+from core.cache import get_cache_version
+from core.constants import RENDERED_CACHE_TIMEOUT
+from core.db import insert_ignore_conflict, insert_ignore_conflicts
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 from recipes.models import Recipe
 from rest_framework import status
 from rest_framework.response import Response
@@ -8,7 +20,15 @@ from users.models import User
 def create_relation(request, obj_id, model_class, serializer_class, obj_model,
                     user_field='user', obj_field='recipe', error_exists=None,
                     error_self=None, check_self=False):
-    """Создаёт отношения между пользователем и объектом."""
+    """
+    Создаёт отношения между пользователем и объектом.
+
+    Вставка выполняется одним INSERT ... ON CONFLICT DO NOTHING, поэтому
+    повторный запрос получает 400, а не IntegrityError. Побочные эффекты
+    модели отношения (счётчики, суммы списка покупок) выполняются в той
+    же транзакции, что и вставка. Ответ строится по уже загруженному
+    объекту без повторного запроса.
+    """
     user = request.user
     obj = get_object_or_404(obj_model, id=obj_id)
 
@@ -19,28 +39,42 @@ def create_relation(request, obj_id, model_class, serializer_class, obj_model,
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    filter_kwargs = {user_field: user, obj_field: obj}
-    if model_class.objects.filter(**filter_kwargs).exists():
+    with transaction.atomic():
+        pk = insert_ignore_conflict(
+            model_class,
+            **{f'{user_field}_id': user.id, f'{obj_field}_id': obj.id}
+        )
+        if pk is not None:
+            model_class.on_relations_created(user.id, [obj.id])
+
+    if pk is None:
         return Response(
             {'error': error_exists or 'Отношение уже существует'},
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    data = {user_field: user.id, obj_field: obj.id}
-    serializer = serializer_class(data=data, context={'request': request})
-    serializer.is_valid(raise_exception=True)
-    serializer.save()
-
+    if obj_model is User:
+        obj.is_subscribed = True
+    relation = model_class(pk=pk, **{user_field: user, obj_field: obj})
+    serializer = serializer_class(relation, context={'request': request})
     return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
 def delete_relation(request, obj_id, model_class, user_field='user',
                     obj_field='recipe', error_not_found=None):
-    """Удаляет отношения пользователь - объект."""
+    """
+    Удаляет отношения пользователь - объект.
+
+    Побочные эффекты модели отношения выполняются в той же транзакции,
+    что и удаление, только если отношение существовало.
+    """
     user = request.user
 
     filter_kwargs = {user_field: user, f'{obj_field}_id': obj_id}
-    deleted, _ = model_class.objects.filter(**filter_kwargs).delete()
+    with transaction.atomic():
+        deleted, _ = model_class.objects.filter(**filter_kwargs).delete()
+        if deleted:
+            model_class.on_relations_deleted(user.id, [obj_id])
 
     if not deleted:
         return Response(
@@ -51,6 +85,75 @@ def delete_relation(request, obj_id, model_class, user_field='user',
     return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+def create_relations_bulk(request, recipe_ids, model_class):
+    """
+    Добавляет рецепты в коллекцию пользователя одним пакетом.
+
+    Возвращает результат для каждого id: created, exists или not_found.
+    Вставка выполняется одним INSERT ... ON CONFLICT DO NOTHING
+    RETURNING, и счётчики с суммами списка покупок меняются только
+    для реально вставленных строк, даже если параллельный запрос
+    добавил часть рецептов раньше.
+    """
+    user = request.user
+    found = set(
+        Recipe.objects.filter(id__in=recipe_ids).values_list('id', flat=True)
+    )
+    with transaction.atomic():
+        created = insert_ignore_conflicts(
+            model_class,
+            [
+                {'user_id': user.id, 'recipe_id': recipe_id}
+                for recipe_id in dict.fromkeys(recipe_ids)
+                if recipe_id in found
+            ],
+            returning='recipe_id'
+        )
+        if created:
+            model_class.on_relations_created(user.id, created)
+
+    created = set(created)
+    results = []
+    for recipe_id in recipe_ids:
+        if recipe_id not in found:
+            result = 'not_found'
+        elif recipe_id in created:
+            result = 'created'
+        else:
+            result = 'exists'
+        results.append({'id': recipe_id, 'status': result})
+    return Response({'results': results}, status=status.HTTP_200_OK)
+
+
+def delete_relations_bulk(request, recipe_ids, model_class):
+    """
+    Удаляет рецепты из коллекции пользователя одним пакетом.
+
+    Возвращает результат для каждого id: deleted или not_found.
+    """
+    user = request.user
+    with transaction.atomic():
+        deleted = set(
+            model_class.objects.select_for_update().filter(
+                user=user, recipe_id__in=recipe_ids
+            ).values_list('recipe_id', flat=True)
+        )
+        if deleted:
+            model_class.objects.filter(
+                user=user, recipe_id__in=deleted
+            ).delete()
+            model_class.on_relations_deleted(user.id, list(deleted))
+
+    results = [
+        {
+            'id': recipe_id,
+            'status': 'deleted' if recipe_id in deleted else 'not_found'
+        }
+        for recipe_id in recipe_ids
+    ]
+    return Response({'results': results}, status=status.HTTP_200_OK)
+
+
 class CollectionActionMixin:
     """Миксин для действий с коллекциями рецептов."""
 
@@ -75,6 +178,16 @@ class CollectionActionMixin:
                 error_not_found=error_not_found
             )
 
+    def handle_bulk_collection_action(self, request, model_class):
+        """Обрабатывает массовое добавление/удаление рецептов."""
+        serializer = RecipeIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        recipe_ids = serializer.validated_data['recipes']
+        if request.method == 'POST':
+            return create_relations_bulk(request, recipe_ids, model_class)
+        elif request.method == 'DELETE':
+            return delete_relations_bulk(request, recipe_ids, model_class)
+
 
 class SubscriptionActionMixin:
     """Миксин для действий с подписками на авторов."""
@@ -104,3 +217,136 @@ class SubscriptionActionMixin:
                 obj_field='author',
                 error_not_found='Вы не подписаны на этого автора'
             )
+
+
+class RenderedCacheMixin:
+    """
+    Миксин кеширования отрендеренных тел ответов в кеше Django.
+
+    Ключи включают версию и полный путь с параметрами, поэтому записи
+    ограничены по времени жизни, иначе каждый новый поисковый запрос
+    навсегда оставался бы в общем кеше.
+    """
+
+    cache_timeout = RENDERED_CACHE_TIMEOUT
+
+    def _cached_response(self, key, handler, request, *args, **kwargs):
+        """Отдаёт отрендеренное тело из кеша или рендерит и кеширует его."""
+        renderer = request.accepted_renderer
+        if renderer.format == 'api':
+            return handler(request, *args, **kwargs)
+
+        content = cache.get(key)
+        metrics.store.inc(
+            'cache_requests_total', cache=self.cache_namespace,
+            result='miss' if content is None else 'hit'
+        )
+        if content is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            content = renderer.render(
+                response.data, request.accepted_media_type,
+                self.get_renderer_context()
+            )
+            cache.set(key, content, timeout=self.cache_timeout)
+        return HttpResponse(content, content_type=request.accepted_media_type)
+
+
+class ConditionalGetMixin(RenderedCacheMixin):
+    """
+    Миксин условного GET для редко меняющихся справочников.
+
+    Версия данных хранится в кеше Django и сбрасывается сигналами при
+    изменении моделей. Из версии и адреса запроса строятся ETag и
+    Last-Modified: на If-None-Match/If-Modified-Since отдаётся 304 без
+    выполнения запроса к БД, а отрендеренное тело ответа кешируется
+    до следующей смены версии.
+    """
+
+    cache_namespace = None
+    cache_max_age = 0
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        version = get_cache_version(self.cache_namespace)
+        digest = hashlib.md5(
+            f'{version}:{request.accepted_media_type}:'
+            f'{request.get_full_path()}'.encode()
+        ).hexdigest()
+        etag = f'"{digest}"'
+        last_modified = version // 1_000_000_000
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is not None:
+            metrics.store.inc(
+                'cache_requests_total', cache=self.cache_namespace,
+                result='not_modified'
+            )
+        else:
+            response = self._cached_response(
+                f'{self.cache_namespace}:body:{digest}',
+                handler, request, *args, **kwargs
+            )
+        if response.status_code not in (
+                status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            return response
+
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(
+            response, public=True, max_age=self.cache_max_age,
+            must_revalidate=True
+        )
+        return response
+
+
+class AnonymousCacheMixin(RenderedCacheMixin):
+    """
+    Миксин кеширования ответов list и retrieve для анонимных запросов.
+
+    Анонимные ответы не зависят от пользователя, поэтому кешируются по
+    нормализованным параметрам запроса. Ключ включает версию данных:
+    при любом изменении версия меняется, и старые записи просто
+    перестают использоваться и вытесняются по таймауту.
+    """
+
+    cache_namespace = None
+
+    def list(self, request, *args, **kwargs):
+        return self.anonymous_cached_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.anonymous_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def anonymous_cached_response(self, handler, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return handler(request, *args, **kwargs)
+        params = sorted(
+            (name, sorted(values))
+            for name, values in request.query_params.lists()
+        )
+        digest = hashlib.md5(
+            f'{request.build_absolute_uri(request.path)}:'
+            f'{request.accepted_media_type}:{params}'.encode()
+        ).hexdigest()
+        version = get_cache_version(self.cache_namespace)
+        return self._cached_response(
+            f'{self.cache_namespace}:anonymous:{version}:{digest}',
+            handler, request, *args, **kwargs
+        )
@@ -1,5 +1,112 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
 
 
 class CustomPagination(PageNumberPagination):
+    """
+    Постраничная пагинация с дополнительным режимом курсора.
+
+    Если представление задаёт cursor_ordering, а в запросе передан
+    параметр cursor (в том числе пустой), используется пагинация по
+    ключу: без COUNT(*) и OFFSET, с постоянной стоимостью страницы.
+    Другая сортировка (параметр ordering или релевантность поиска)
+    с курсором несовместима и отклоняется с ошибкой 400.
+    """
+
     page_size_query_param = 'limit'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Неверный курсор'
+    cursor_ordering_message = (
+        'Пагинация курсором не поддерживает другую сортировку'
+    )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_ordering = getattr(view, 'cursor_ordering', None)
+        if (not self.cursor_ordering
+                or self.cursor_query_param not in request.query_params):
+            self.cursor_ordering = None
+            return super().paginate_queryset(queryset, request, view)
+
+        if (api_settings.ORDERING_PARAM in request.query_params
+                or 'search_rank' in queryset.query.annotations):
+            raise ValidationError(
+                {self.cursor_query_param: [self.cursor_ordering_message]}
+            )
+        self.request = request
+        page_size = self.get_page_size(request)
+        cursor = request.query_params[self.cursor_query_param]
+        queryset = queryset.order_by(*self.cursor_ordering)
+        if cursor:
+            queryset = queryset.filter(self._decode_cursor(queryset, cursor))
+
+        results = list(queryset[:page_size + 1])
+        self.next_cursor = None
+        if len(results) > page_size:
+            results = results[:page_size]
+            self.next_cursor = self._encode_cursor(results[-1])
+        return results
+
+    def get_paginated_response(self, data):
+        if not self.cursor_ordering:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_cursor_link()),
+            ('results', data),
+        ]))
+
+    def get_next_cursor_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.next_cursor
+        )
+
+    def _encode_cursor(self, obj):
+        values = [
+            getattr(obj, field.lstrip('-')) for field in self.cursor_ordering
+        ]
+        payload = json.dumps(values, default=str)
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def _decode_cursor(self, queryset, cursor):
+        """
+        Строит условие «после курсора» для составного ключа сортировки.
+
+        К дизъюнкции по полям ключа добавляется избыточная граница
+        по первому полю: по ней PostgreSQL ищет начало диапазона
+        в индексе, а не просматривает его с начала.
+        """
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            fields = [field.lstrip('-') for field in self.cursor_ordering]
+            if len(values) != len(fields):
+                raise ValueError
+            values = [
+                queryset.model._meta.get_field(field).to_python(value)
+                for field, value in zip(fields, values)
+            ]
+        except (ValueError, TypeError, binascii.Error,
+                DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        condition = Q()
+        equal = {}
+        for ordering, field, value in zip(
+                self.cursor_ordering, fields, values):
+            lookup = 'lt' if ordering.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{field}__{lookup}': value})
+            equal[field] = value
+        lookup = 'lte' if self.cursor_ordering[0].startswith('-') else 'gte'
+        return Q(**{f'{fields[0]}__{lookup}': values[0]}) & condition
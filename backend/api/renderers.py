@@ -0,0 +1,83 @@
+from django.conf import settings
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def use_orjson():
+    """Включён ли orjson настройкой JSON_BACKEND и установлен ли он."""
+    return orjson is not None and settings.JSON_BACKEND == 'orjson'
+
+
+class EchoBuffer:
+    """Псевдобуфер, возвращающий записанное для потоковой выдачи CSV."""
+
+    def write(self, value):
+        return value
+
+
+class TextRenderer(BaseRenderer):
+    """
+    Базовый рендерер для текстовых выгрузок.
+
+    Сами выгрузки отдаются потоком в обход рендерера, поэтому он
+    используется для выбора формата по параметру format и для вывода
+    сообщений об ошибках в виде строк «поле: сообщение».
+    """
+
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if isinstance(data, dict):
+            data = '\n'.join(f'{key}: {value}' for key, value in data.items())
+        return str(data).encode(self.charset)
+
+
+class PlainTextRenderer(TextRenderer):
+    media_type = 'text/plain'
+    format = 'txt'
+
+
+class CSVRenderer(TextRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSON-рендерер на orjson с тем же выводом, что и у JSONRenderer.
+
+    Без orjson, при JSON_BACKEND=json или при запросе с отступами
+    работает как стандартный JSONRenderer. Типы, которых orjson не знает
+    (в том числе datetime), кодируются тем же JSONEncoder, что и в DRF.
+    Если orjson не может закодировать данные (например, целое вне
+    64 бит), ответ рендерится стандартным JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        if not use_orjson() or indent or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                default=JSONEncoder().default,
+                option=(
+                    orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+                )
+            )
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Как и JSONRenderer, экранируем разделители строк для JavaScript.
+        return ret.replace(
+            '\u2028'.encode(), b'\\u2028'
+        ).replace('\u2029'.encode(), b'\\u2029')
@@ -1,8 +1,10 @@
 from .base_serializers import Base64ImageField
+from .read_serializers import RecipeReadSerializer
 from .recipe_serializers import (IngredientSerializer, RecipeCreateSerializer,
                                  RecipeMinifiedSerializer, RecipeSerializer,
                                  TagSerializer)
-from .relation_serializers import (FavoriteSerializer, ShoppingCartSerializer,
+from .relation_serializers import (FavoriteSerializer, RecipeIdsSerializer,
+                                   ShoppingCartSerializer,
                                    SubscriptionSerializer)
 from .user_serializers import (SetAvatarSerializer, SetPasswordSerializer,
                                UserCreateSerializer, UserSerializer,
@@ -13,6 +15,8 @@ __all__ = [
     'SetAvatarSerializer', 'UserWithRecipesSerializer',
     'TagSerializer', 'IngredientSerializer',
     'RecipeSerializer', 'RecipeCreateSerializer', 'RecipeMinifiedSerializer',
+    'RecipeReadSerializer',
     'FavoriteSerializer', 'ShoppingCartSerializer', 'SubscriptionSerializer',
+    'RecipeIdsSerializer',
     'Base64ImageField',
 ]
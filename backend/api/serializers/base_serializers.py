@@ -1,10 +1,48 @@
 import base64
+from collections.abc import Mapping
 
+from core.constants import MAX_PK_VALUE
+from core.images import rendition_url, renditions_ready
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.core.files.base import ContentFile
 from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
 
 
-class Base64ImageField(serializers.ImageField):
+class RenditionImageField(serializers.ImageField):
+    """
+    Поле изображения, отдающее адрес уменьшенной копии.
+
+    rendition задаёт копию по умолчанию, list_rendition — копию для
+    действия list. Пока копии не созданы (флаг модели
+    <поле>_renditions_ready), отдаётся оригинал; хранилище при чтении
+    не проверяется.
+    """
+
+    def __init__(self, *args, rendition=None, list_rendition=None,
+                 **kwargs):
+        self.rendition = rendition
+        self.list_rendition = list_rendition
+        super().__init__(*args, **kwargs)
+
+    def get_rendition(self):
+        view = self.context.get('view')
+        if self.list_rendition and getattr(view, 'action', None) == 'list':
+            return self.list_rendition
+        return self.rendition
+
+    def to_representation(self, value):
+        rendition = self.get_rendition()
+        if not value or not rendition or not renditions_ready(value):
+            return super().to_representation(value)
+        url = rendition_url(value.name, rendition)
+        request = self.context.get('request')
+        if request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+
+class Base64ImageField(RenditionImageField):
     """Поле для обработки изображений, закодированных в base64."""
 
     def to_internal_value(self, data):
@@ -13,3 +51,99 @@ class Base64ImageField(serializers.ImageField):
             ext = format.split('/')[-1]
             data = ContentFile(base64.b64decode(imgstr), name=f'temp.{ext}')
         return super().to_internal_value(data)
+
+
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Поле первичного ключа, которое берёт объекты из заранее загруженного
+    словаря.
+
+    Словарь заполняет preload() одним запросом IN для всех значений;
+    без него поле работает как обычный PrimaryKeyRelatedField.
+    """
+
+    def __init__(self, **kwargs):
+        self.objects = None
+        super().__init__(**kwargs)
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BulkManyRelatedField(**list_kwargs)
+
+    def to_pk(self, data):
+        if self.pk_field is not None:
+            data = self.pk_field.to_internal_value(data)
+        return self.get_queryset().model._meta.pk.to_python(data)
+
+    def preload(self, values):
+        """Загружает объекты для всех корректных значений одним запросом."""
+        pks = set()
+        for value in values:
+            try:
+                pk = self.to_pk(value)
+            except (TypeError, ValueError, DjangoValidationError,
+                    serializers.ValidationError):
+                continue
+            # Ключи вне диапазона bigint не отправляются в базу.
+            if not isinstance(pk, int) or 0 < pk <= MAX_PK_VALUE:
+                pks.add(pk)
+        self.objects = self.get_queryset().in_bulk(pks)
+
+    def to_internal_value(self, data):
+        if self.objects is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = self.to_pk(data)
+        except (TypeError, ValueError, DjangoValidationError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if pk not in self.objects:
+            self.fail('does_not_exist', pk_value=data)
+        return self.objects[pk]
+
+
+class BulkManyRelatedField(serializers.ManyRelatedField):
+    """
+    Список первичных ключей, проверяемый одним запросом.
+
+    В отличие от ManyRelatedField сообщает обо всех несуществующих
+    значениях сразу, а не только о первом.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        self.child_relation.preload(data)
+        objects, errors = [], []
+        for item in data:
+            try:
+                objects.append(self.child_relation.to_internal_value(item))
+            except serializers.ValidationError as error:
+                errors.extend(error.detail)
+        if errors:
+            raise serializers.ValidationError(errors)
+        return objects
+
+
+class BulkRelatedListSerializer(serializers.ListSerializer):
+    """
+    Список вложенных объектов, в котором поля BulkPrimaryKeyRelatedField
+    всех элементов проверяются одним запросом на поле.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            for name, field in self.child.fields.items():
+                if isinstance(field, BulkPrimaryKeyRelatedField):
+                    field.preload(
+                        item.get(name) for item in data
+                        if isinstance(item, Mapping)
+                    )
+        return super().to_internal_value(data)
@@ -0,0 +1,66 @@
+from api.serializers.base_serializers import RenditionImageField
+from api.serializers.user_serializers import UserSerializer
+from rest_framework import serializers
+
+
+class RecipeReadSerializer(serializers.BaseSerializer):
+    """
+    Сериализатор рецепта только для чтения.
+
+    Возвращает тот же JSON, что и RecipeSerializer, но собирает его
+    напрямую из предзагруженных объектов: без вложенных сериализаторов
+    и обхода полей DRF для каждого тега и ингредиента. Рассчитан на
+    queryset из RecipeViewSet.get_queryset().
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.image = RenditionImageField(
+            rendition='detail', list_rendition='card', read_only=True
+        )
+        self.image.bind('image', self)
+        self.author = UserSerializer()
+        self.author.bind('author', self)
+        self.avatar = self.author.fields['avatar']
+
+    def serialize_author(self, author):
+        return {
+            'email': author.email,
+            'id': author.id,
+            'username': author.username,
+            'first_name': author.first_name,
+            'last_name': author.last_name,
+            'is_subscribed': self.author.get_is_subscribed(author),
+            'avatar': self.avatar.to_representation(author.avatar),
+            'recipes_count': author.recipes_count,
+            'subscribers_count': author.subscribers_count,
+        }
+
+    def to_representation(self, instance):
+        return {
+            'id': instance.id,
+            'tags': [
+                {'id': tag.id, 'name': tag.name, 'slug': tag.slug}
+                for tag in instance.tags.all()
+            ],
+            'author': self.serialize_author(instance.author),
+            'ingredients': [
+                {
+                    'id': item.ingredient.id,
+                    'name': item.ingredient.name,
+                    'measurement_unit': item.ingredient.measurement_unit,
+                    'amount': item.amount,
+                }
+                for item in instance.recipe_ingredients.all()
+            ],
+            'is_favorited': bool(getattr(instance, 'is_favorited', False)),
+            'is_in_shopping_cart': bool(
+                getattr(instance, 'is_in_shopping_cart', False)
+            ),
+            'name': instance.name,
+            'image': self.image.to_representation(instance.image),
+            'text': instance.text,
+            'cooking_time': instance.cooking_time,
+            'favorites_count': instance.favorites_count,
+            'shopping_carts_count': instance.shopping_carts_count,
+        }
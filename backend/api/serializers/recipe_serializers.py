@@ -1,7 +1,19 @@
 # api/serializers/recipe_serializers.py
-from api.serializers.base_serializers import Base64ImageField
-from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
+from collections import Counter
+
+from api.serializers.base_serializers import (Base64ImageField,
+                                              BulkPrimaryKeyRelatedField,
+                                              BulkRelatedListSerializer,
+                                              RenditionImageField)
+from core.counters import change_counter
+from core.images import RECIPE_RENDITIONS
+from core.tasks import delete_images, generate_renditions
+from django.db import transaction
+from jobs.registry import enqueue
+from recipes.models import (Ingredient, Recipe, RecipeIngredient,
+                            ShoppingCartIngredient, Tag)
 from rest_framework import serializers
+from users.models import User
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -29,11 +41,12 @@ class RecipeIngredientSerializer(serializers.ModelSerializer):
 
 
 class RecipeIngredientCreateSerializer(serializers.ModelSerializer):
-    id = serializers.PrimaryKeyRelatedField(queryset=Ingredient.objects.all())
+    id = BulkPrimaryKeyRelatedField(queryset=Ingredient.objects.all())
 
     class Meta:
         model = RecipeIngredient
         fields = ('id', 'amount')
+        list_serializer_class = BulkRelatedListSerializer
 
 
 class RecipeSerializer(serializers.ModelSerializer):
@@ -48,6 +61,9 @@ class RecipeSerializer(serializers.ModelSerializer):
     is_in_shopping_cart = serializers.BooleanField(
         read_only=True, default=False
     )
+    image = RenditionImageField(
+        rendition='detail', list_rendition='card', read_only=True
+    )
 
     def get_author(self, obj):
         from api.serializers.user_serializers import UserSerializer
@@ -57,14 +73,13 @@ class RecipeSerializer(serializers.ModelSerializer):
         model = Recipe
         fields = (
             'id', 'tags', 'author', 'ingredients', 'is_favorited',
-            'is_in_shopping_cart', 'name', 'image', 'text', 'cooking_time'
+            'is_in_shopping_cart', 'name', 'image', 'text', 'cooking_time',
+            'favorites_count', 'shopping_carts_count'
         )
 
 
 class RecipeCreateSerializer(serializers.ModelSerializer):
-    tags = serializers.PrimaryKeyRelatedField(
-        queryset=Tag.objects.all(), many=True
-    )
+    tags = BulkPrimaryKeyRelatedField(queryset=Tag.objects.all(), many=True)
     ingredients = RecipeIngredientCreateSerializer(many=True)
     image = Base64ImageField()
 
@@ -119,23 +134,92 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
             )
         RecipeIngredient.objects.bulk_create(recipe_ingredients)
 
+    @transaction.atomic
     def create(self, validated_data):
         tags = validated_data.pop('tags')
         ingredients = validated_data.pop('ingredients')
-        recipe = Recipe.objects.create(
-            author=self.context['request'].user, **validated_data
-        )
+        author = self.context['request'].user
+        recipe = Recipe.objects.create(author=author, **validated_data)
         recipe.tags.set(tags)
         self.create_ingredients(recipe, ingredients)
+        change_counter(User.objects.filter(pk=author.pk), 'recipes_count', 1)
+        enqueue(
+            generate_renditions, name=recipe.image.name,
+            renditions=RECIPE_RENDITIONS, model='recipes.Recipe',
+            field='image'
+        )
         return recipe
 
+    def update_ingredients(self, recipe, ingredients):
+        """
+        Приводит состав рецепта к ingredients, меняя только отличия.
+
+        Новые ингредиенты добавляются, изменённые количества обновляются
+        одним bulk_update, убранные удаляются. Возвращает изменения
+        количеств {id ингредиента: разница} для списков покупок.
+        """
+        stored = {
+            recipe_ingredient.ingredient_id: recipe_ingredient
+            for recipe_ingredient in RecipeIngredient.objects.filter(
+                recipe=recipe
+            ).select_for_update()
+        }
+        submitted = {
+            ingredient_data['id'].id: ingredient_data['amount']
+            for ingredient_data in ingredients
+        }
+        deltas = Counter()
+        to_create, to_update = [], []
+        for ingredient_id, amount in submitted.items():
+            recipe_ingredient = stored.get(ingredient_id)
+            if recipe_ingredient is None:
+                deltas[ingredient_id] += amount
+                to_create.append(RecipeIngredient(
+                    recipe=recipe, ingredient_id=ingredient_id, amount=amount
+                ))
+            elif recipe_ingredient.amount != amount:
+                deltas[ingredient_id] += amount - recipe_ingredient.amount
+                recipe_ingredient.amount = amount
+                to_update.append(recipe_ingredient)
+        to_delete = [
+            recipe_ingredient for ingredient_id, recipe_ingredient
+            in stored.items() if ingredient_id not in submitted
+        ]
+        for recipe_ingredient in to_delete:
+            deltas[recipe_ingredient.ingredient_id] -= recipe_ingredient.amount
+
+        if to_delete:
+            RecipeIngredient.objects.filter(
+                pk__in=[item.pk for item in to_delete]
+            ).delete()
+        if to_update:
+            RecipeIngredient.objects.bulk_update(to_update, ['amount'])
+        if to_create:
+            RecipeIngredient.objects.bulk_create(to_create)
+        return deltas
+
+    @transaction.atomic
     def update(self, instance, validated_data):
         tags = validated_data.pop('tags')
         ingredients = validated_data.pop('ingredients')
         instance.tags.set(tags)
-        instance.recipe_ingredients.all().delete()
-        self.create_ingredients(instance, ingredients)
-        return super().update(instance, validated_data)
+        deltas = self.update_ingredients(instance, ingredients)
+        ShoppingCartIngredient.objects.change_recipe(instance.id, deltas)
+        old_image = instance.image.name
+        if 'image' in validated_data:
+            validated_data['image_renditions_ready'] = False
+        instance = super().update(instance, validated_data)
+        if instance.image.name != old_image:
+            enqueue(
+                generate_renditions, name=instance.image.name,
+                renditions=RECIPE_RENDITIONS, model='recipes.Recipe',
+                field='image'
+            )
+            enqueue(
+                delete_images, names=[old_image],
+                renditions=RECIPE_RENDITIONS
+            )
+        return instance
 
     def to_representation(self, instance):
         serializer = RecipeSerializer(
@@ -145,6 +229,8 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
 
 
 class RecipeMinifiedSerializer(serializers.ModelSerializer):
+    image = RenditionImageField(rendition='card', read_only=True)
+
     class Meta:
         model = Recipe
         fields = ('id', 'name', 'image', 'cooking_time')
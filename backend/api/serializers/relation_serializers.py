@@ -1,5 +1,6 @@
 from api.serializers.recipe_serializers import RecipeMinifiedSerializer
 from api.serializers.user_serializers import UserWithRecipesSerializer
+from core.constants import BULK_RELATIONS_LIMIT, MAX_PK_VALUE
 from recipes.models import Favorite, ShoppingCart
 from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
@@ -44,6 +45,21 @@ class ShoppingCartSerializer(serializers.ModelSerializer):
         ).data
 
 
+class RecipeIdsSerializer(serializers.Serializer):
+    """Список id рецептов для массового добавления и удаления."""
+
+    recipes = serializers.ListField(
+        child=serializers.IntegerField(
+            min_value=1, max_value=MAX_PK_VALUE
+        ),
+        allow_empty=False,
+        max_length=BULK_RELATIONS_LIMIT
+    )
+
+    def validate_recipes(self, value):
+        return list(dict.fromkeys(value))
+
+
 class SubscriptionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Subscription
@@ -1,23 +1,30 @@
+from core.images import AVATAR_RENDITIONS
+from core.tasks import delete_images, generate_renditions
+from jobs.registry import enqueue
 from rest_framework import serializers
 from users.models import Subscription, User
 
-from .base_serializers import Base64ImageField
+from .base_serializers import Base64ImageField, RenditionImageField
 from .recipe_serializers import RecipeMinifiedSerializer
 
 
 class UserSerializer(serializers.ModelSerializer):
     is_subscribed = serializers.SerializerMethodField()
+    avatar = RenditionImageField(rendition='avatar', read_only=True)
 
     class Meta:
         model = User
         fields = (
             'email', 'id', 'username', 'first_name', 'last_name',
-            'is_subscribed', 'avatar'
+            'is_subscribed', 'avatar', 'recipes_count', 'subscribers_count'
         )
+        read_only_fields = ('recipes_count', 'subscribers_count')
 
     def get_is_subscribed(self, obj):
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
         user = self.context.get('request').user
-        if user.is_anonymous:
+        if user.is_anonymous or user.pk == obj.pk:
             return False
         return Subscription.objects.filter(user=user, author=obj).exists()
 
@@ -40,26 +47,45 @@ class SetPasswordSerializer(serializers.Serializer):
 
 
 class SetAvatarSerializer(serializers.ModelSerializer):
-    avatar = Base64ImageField(required=True)
+    avatar = Base64ImageField(required=True, rendition='avatar')
 
     class Meta:
         model = User
         fields = ('avatar',)
 
+    def update(self, instance, validated_data):
+        old_avatar = instance.avatar.name
+        validated_data['avatar_renditions_ready'] = False
+        instance = super().update(instance, validated_data)
+        enqueue(
+            generate_renditions, name=instance.avatar.name,
+            renditions=AVATAR_RENDITIONS, model='users.User', field='avatar'
+        )
+        if old_avatar:
+            enqueue(
+                delete_images, names=[old_avatar],
+                renditions=AVATAR_RENDITIONS
+            )
+        return instance
+
 
 class UserWithRecipesSerializer(UserSerializer):
     recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.IntegerField(read_only=True, default=0)
 
     class Meta:
         model = User
         fields = (
             'email', 'id', 'username', 'first_name', 'last_name',
-            'is_subscribed', 'avatar',
+            'is_subscribed', 'avatar', 'subscribers_count',
             'recipes', 'recipes_count'
         )
+        read_only_fields = ('recipes_count', 'subscribers_count')
 
     def get_recipes(self, obj):
+        if hasattr(obj, 'recipes_preview'):
+            return RecipeMinifiedSerializer(
+                obj.recipes_preview, many=True
+            ).data
         request = self.context.get('request')
         limit = request.query_params.get('recipes_limit')
         recipes = obj.recipes.all()
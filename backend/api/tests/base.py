@@ -0,0 +1,37 @@
+from django.test import override_settings
+from recipes.benchmark import create_recipes
+from rest_framework.test import APITestCase
+from users.models import Subscription
+
+TEST_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tests',
+    }
+}
+
+
+@override_settings(CACHES=TEST_CACHES)
+class FoodgramAPITestCase(APITestCase):
+    """
+    Базовый класс тестов API на синтетических данных.
+
+    Кеш подменяется отдельным LocMemCache, чтобы тесты не зависели
+    от общего кеша и не засоряли его.
+    """
+
+    recipes_count = 12
+    authors_count = 4
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.authors, cls.viewer = create_recipes(
+            cls.recipes_count, authors=cls.authors_count
+        )
+        Subscription.objects.bulk_create(
+            Subscription(user=cls.viewer, author=author)
+            for author in cls.authors
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.viewer)
@@ -0,0 +1,72 @@
+from core.counters import change_counter
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from users.authentication import CachedTokenAuthentication
+from users.models import User
+
+from .base import FoodgramAPITestCase
+
+
+class CachedTokenAuthenticationTest(FoodgramAPITestCase):
+    """Кеш токенов и его сброс при выходе, смене пароля и деактивации."""
+
+    password = 'Benchmark-password-1'
+
+    def setUp(self):
+        self.viewer.set_password(self.password)
+        self.viewer.save()
+        self.token = Token.objects.create(user=self.viewer)
+        self.client.force_authenticate(None)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.authentication = CachedTokenAuthentication()
+
+    def authenticate(self, queries):
+        with self.assertNumQueries(queries):
+            user, _ = self.authentication.authenticate_credentials(
+                self.token.key
+            )
+        return user
+
+    def test_repeat_request_without_queries(self):
+        self.authenticate(1)
+        user = self.authenticate(0)
+        self.assertEqual(user, self.viewer)
+
+    def test_logout(self):
+        self.authenticate(1)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('api:logout'))
+        self.assertEqual(response.status_code, 204)
+        response = self.client.get(reverse('api:users-me'))
+        self.assertEqual(response.status_code, 401)
+
+    def test_set_password(self):
+        self.authenticate(1)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('api:users-set-password'),
+                {'current_password': self.password,
+                 'new_password': 'Another-password-2'}
+            )
+        self.assertEqual(response.status_code, 204)
+        self.authenticate(1)
+
+    def test_deactivation(self):
+        self.authenticate(1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.viewer.is_active = False
+            self.viewer.save()
+        response = self.client.get(reverse('api:users-me'))
+        self.assertEqual(response.status_code, 401)
+
+    def test_cached_counters_not_written_back(self):
+        self.authenticate(1)
+        user = self.authenticate(0)
+        change_counter(User.objects.filter(pk=user.pk), 'recipes_count', 5)
+        user.first_name = 'Новое имя'
+        user.save()
+        self.viewer.refresh_from_db()
+        self.assertEqual(self.viewer.first_name, 'Новое имя')
+        self.assertEqual(
+            self.viewer.recipes_count, user.recipes_count + 5
+        )
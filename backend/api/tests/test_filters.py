@@ -0,0 +1,63 @@
+from collections import defaultdict
+
+from api.filters import TAGS_MATCH_ALL, TAGS_MATCH_ANY, RecipeFilter
+from django.urls import reverse
+from recipes.models import Recipe
+
+from .base import FoodgramAPITestCase
+
+SLUGS = ['benchmark-0', 'benchmark-1']
+
+
+class TagFilterTest(FoodgramAPITestCase):
+    """Фильтр по тегам: EXISTS без JOIN и DISTINCT, режимы any и all."""
+
+    def expected(self, mode):
+        tags_by_recipe = defaultdict(set)
+        for recipe_id, slug in Recipe.tags.through.objects.filter(
+            tag__slug__in=SLUGS
+        ).values_list('recipe_id', 'tag__slug'):
+            tags_by_recipe[recipe_id].add(slug)
+        if mode == TAGS_MATCH_ANY:
+            return set(tags_by_recipe)
+        return {
+            recipe_id for recipe_id, slugs in tags_by_recipe.items()
+            if len(slugs) == len(SLUGS)
+        }
+
+    def test_sql_uses_exists(self):
+        for mode in (TAGS_MATCH_ANY, TAGS_MATCH_ALL):
+            with self.subTest(mode=mode):
+                queryset = RecipeFilter(
+                    {'tags': SLUGS, 'tags_match': mode},
+                    queryset=Recipe.objects.all()
+                ).qs
+                sql = str(queryset.query).upper()
+                self.assertIn('EXISTS', sql)
+                self.assertNotIn('DISTINCT', sql)
+                self.assertNotIn('JOIN', sql)
+
+    def test_results(self):
+        url = reverse('api:recipes-list')
+        for mode in (TAGS_MATCH_ANY, TAGS_MATCH_ALL):
+            with self.subTest(mode=mode):
+                response = self.client.get(url, {
+                    'tags': SLUGS, 'tags_match': mode,
+                    'limit': self.recipes_count,
+                })
+                self.assertEqual(response.status_code, 200)
+                ids = [recipe['id'] for recipe in response.data['results']]
+                self.assertEqual(len(ids), len(set(ids)))
+                self.assertEqual(response.data['count'], len(ids))
+                self.assertEqual(set(ids), self.expected(mode))
+
+    def test_all_is_subset_of_any(self):
+        self.assertLess(
+            self.expected(TAGS_MATCH_ALL), self.expected(TAGS_MATCH_ANY)
+        )
+
+    def test_unknown_slug(self):
+        response = self.client.get(
+            reverse('api:recipes-list'), {'tags': 'unknown'}
+        )
+        self.assertEqual(response.status_code, 400)
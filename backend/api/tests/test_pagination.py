@@ -0,0 +1,66 @@
+import base64
+from unittest import skipUnless
+
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from recipes.models import Recipe
+
+from .base import FoodgramAPITestCase
+
+
+class CursorPaginationTest(FoodgramAPITestCase):
+    """Пагинация рецептов курсором."""
+
+    def collect_pages(self, limit):
+        url = reverse('api:recipes-list')
+        params = {'cursor': '', 'limit': limit}
+        ids = []
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            ids.extend(recipe['id'] for recipe in response.data['results'])
+            url, params = response.data['next'], None
+        return ids
+
+    def test_stable_with_equal_pub_date(self):
+        Recipe.objects.update(pub_date=timezone.now())
+        ids = self.collect_pages(limit=5)
+        self.assertEqual(
+            ids, sorted(Recipe.objects.values_list('id', flat=True),
+                        reverse=True)
+        )
+
+    def test_order_matches_page_numbers(self):
+        response = self.client.get(
+            reverse('api:recipes-list'), {'limit': self.recipes_count}
+        )
+        self.assertEqual(
+            self.collect_pages(limit=5),
+            [recipe['id'] for recipe in response.data['results']]
+        )
+
+    def test_invalid_cursor(self):
+        for cursor in ('not-base64!', base64.urlsafe_b64encode(b'[1]'),
+                       base64.urlsafe_b64encode(b'{"a": 1}'),
+                       base64.urlsafe_b64encode(b'["bad", 1]')):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(
+                    reverse('api:recipes-list'), {'cursor': cursor}
+                )
+                self.assertEqual(response.status_code, 404)
+
+    def test_other_ordering_rejected(self):
+        response = self.client.get(
+            reverse('api:recipes-list'),
+            {'cursor': '', 'ordering': 'cooking_time'}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    @skipUnless(connection.vendor == 'postgresql', 'Поиск требует PostgreSQL')
+    def test_search_ordering_rejected(self):
+        response = self.client.get(
+            reverse('api:recipes-list'), {'cursor': '', 'search': 'Рецепт'}
+        )
+        self.assertEqual(response.status_code, 400)
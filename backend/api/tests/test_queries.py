@@ -0,0 +1,38 @@
+from django.urls import reverse
+
+from .base import FoodgramAPITestCase
+
+PAGE_SIZES = (2, 4)
+
+
+class QueryCountTest(FoodgramAPITestCase):
+    """Число SQL-запросов списков не зависит от размера страницы."""
+
+    def assert_queries_per_page(self, url, num, **params):
+        for limit in PAGE_SIZES:
+            with self.subTest(url=url, limit=limit):
+                with self.assertNumQueries(num):
+                    response = self.client.get(
+                        url, {'limit': limit, **params}
+                    )
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.data['results']), limit)
+
+    def test_recipe_list(self):
+        self.assert_queries_per_page(reverse('api:recipes-list'), 5)
+
+    def test_user_list(self):
+        self.assert_queries_per_page(reverse('api:users-list'), 2)
+
+    def test_subscriptions(self):
+        self.assert_queries_per_page(
+            reverse('api:users-subscriptions'), 3, recipes_limit=2
+        )
+
+    def test_user_retrieve(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                reverse('api:users-detail', args=(self.authors[0].id,))
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['is_subscribed'])
@@ -0,0 +1,37 @@
+from django.urls import reverse
+from recipes.models import Favorite, Recipe, ShoppingCart
+
+from .base import FoodgramAPITestCase
+
+
+class CreateRelationTest(FoodgramAPITestCase):
+    """Добавление в избранное и список покупок одним INSERT."""
+
+    def assert_create_relation(self, url_name, model, counter, num):
+        recipe = Recipe.objects.first()
+        url = reverse(url_name, args=(recipe.id,))
+        with self.assertNumQueries(num):
+            response = self.client.post(url)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['id'], recipe.id)
+
+        with self.assertNumQueries(4):
+            response = self.client.post(url)
+        self.assertEqual(response.status_code, 400)
+
+        self.assertEqual(
+            model.objects.filter(user=self.viewer, recipe=recipe).count(), 1
+        )
+        recipe.refresh_from_db()
+        self.assertEqual(getattr(recipe, counter), 1)
+
+    def test_favorite(self):
+        self.assert_create_relation(
+            'api:recipes-favorite', Favorite, 'favorites_count', 5
+        )
+
+    def test_shopping_cart(self):
+        self.assert_create_relation(
+            'api:recipes-shopping-cart', ShoppingCart,
+            'shopping_carts_count', 6
+        )
@@ -1,25 +1,48 @@
+import csv
+
 from api.serializers import (FavoriteSerializer, IngredientSerializer,
-                             RecipeCreateSerializer, RecipeSerializer,
-                             SetAvatarSerializer, SetPasswordSerializer,
-                             ShoppingCartSerializer, SubscriptionSerializer,
-                             TagSerializer, UserSerializer,
-                             UserWithRecipesSerializer)
-from django.db.models import Count, Exists, OuterRef, Prefetch, Sum
-from django.http import HttpResponse
+                             RecipeCreateSerializer, RecipeReadSerializer,
+                             RecipeSerializer, SetAvatarSerializer,
+                             SetPasswordSerializer, ShoppingCartSerializer,
+                             SubscriptionSerializer, TagSerializer,
+                             UserSerializer, UserWithRecipesSerializer)
+from core.constants import (ANONYMOUS_CACHE_TIMEOUT,
+                            INGREDIENTS_CACHE_NAMESPACE,
+                            RECIPES_CACHE_NAMESPACE, SHOPPING_LIST_CHUNK_SIZE,
+                            TAGS_CACHE_NAMESPACE)
+from core.counters import change_counter
+from core.images import AVATAR_RENDITIONS, RECIPE_RENDITIONS
+from core.tasks import delete_images
+from django.db import transaction
+from django.db.models import (BooleanField, Exists, F, OuterRef, Prefetch,
+                              Value, Window)
+from django.db.models.functions import RowNumber
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from djoser.views import UserViewSet as DjoserUserViewSet
+from jobs.registry import enqueue
 from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
-                            ShoppingCart, Tag)
-from rest_framework import filters, permissions, status, viewsets
+                            ShoppingCart, ShoppingCartIngredient, Tag)
+from recipes.search import get_ingredient_index
+from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from users.models import Subscription, User
 
-from .filters import IngredientFilter, RecipeFilter
-from .mixins import CollectionActionMixin, SubscriptionActionMixin
+from .filters import IngredientFilter, RecipeFilter, RecipeOrderingFilter
+from .mixins import (AnonymousCacheMixin, CollectionActionMixin,
+                     ConditionalGetMixin, SubscriptionActionMixin)
 from .pagination import CustomPagination
 from .permissions import IsAuthorOrReadOnly
+from .renderers import CSVRenderer, EchoBuffer, PlainTextRenderer
+
+
+def is_subscribed_expression(user):
+    """Выражение для аннотации признака подписки пользователя на автора."""
+    return Exists(
+        Subscription.objects.filter(user=user, author=OuterRef('pk'))
+    )
 
 
 class UserViewSet(DjoserUserViewSet, SubscriptionActionMixin):
@@ -29,12 +52,72 @@ class UserViewSet(DjoserUserViewSet, SubscriptionActionMixin):
     serializer_class = UserSerializer
     pagination_class = CustomPagination
 
+    def get_queryset(self):
+        """Добавляет признак подписки одним подзапросом на весь список."""
+        queryset = super().get_queryset()
+        user = self.request.user
+        if user.is_authenticated:
+            queryset = queryset.annotate(
+                is_subscribed=is_subscribed_expression(user)
+            )
+        return queryset
+
+    def get_instance(self):
+        """
+        Текущий пользователь со свежими счётчиками.
+
+        Пользователь берётся из кеша токенов, а счётчики меняются
+        UPDATE-запросами без сигналов, поэтому перечитываются из базы.
+        """
+        user = self.request.user
+        user.refresh_from_db(fields=User.counter_fields)
+        return user
+
     def get_permissions(self):
         """Определяет необходимые разрешения в зависимости от действия."""
         if self.action == 'retrieve':
             return [permissions.AllowAny()]
         return super().get_permissions()
 
+    def _attach_recipes_preview(self, authors, limit):
+        """
+        Загружает последние рецепты всех авторов страницы одним запросом.
+
+        Рецепты нумеруются оконной функцией ROW_NUMBER в разрезе автора,
+        поэтому вся страница обслуживается одним запросом вместо запроса
+        на каждого автора. Число рецептов хранится в User.recipes_count.
+        """
+        limit = int(limit) if limit and limit.isdigit() else None
+        if limit == 0:
+            for author in authors:
+                author.recipes_preview = []
+            return
+
+        ranked = Recipe.objects.filter(
+            author_id__in=[author.id for author in authors]
+        ).annotate(
+            row_number=Window(
+                expression=RowNumber(),
+                partition_by=F('author_id'),
+                order_by=(F('pub_date').desc(), F('id').desc())
+            )
+        ).values(
+            'id', 'author_id', 'name', 'image', 'image_renditions_ready',
+            'cooking_time', 'row_number'
+        ).order_by()
+        sql, params = ranked.query.sql_with_params()
+        sql = f'SELECT * FROM ({sql}) AS ranked'
+        if limit is not None:
+            sql += ' WHERE ranked.row_number <= %s'
+            params = (*params, limit)
+        sql += ' ORDER BY ranked.author_id, ranked.row_number'
+
+        previews = {}
+        for recipe in Recipe.objects.raw(sql, params):
+            previews.setdefault(recipe.author_id, []).append(recipe)
+        for author in authors:
+            author.recipes_preview = previews.get(author.id, [])
+
     @action(
         detail=False,
         methods=['get'],
@@ -44,9 +127,12 @@ class UserViewSet(DjoserUserViewSet, SubscriptionActionMixin):
         """Возвращает список авторов, на которых подписан пользователь."""
         user = request.user
         subscriptions = User.objects.filter(subscribers__user=user).annotate(
-            recipes_count=Count('recipes')
+            is_subscribed=Value(True, output_field=BooleanField())
         )
         page = self.paginate_queryset(subscriptions)
+        self._attach_recipes_preview(
+            page, request.query_params.get('recipes_limit')
+        )
         serializer = UserWithRecipesSerializer(
             page, many=True, context={'request': request}
         )
@@ -115,19 +201,28 @@ class UserViewSet(DjoserUserViewSet, SubscriptionActionMixin):
 
         if request.method == 'DELETE':
             if user.avatar:
-                user.avatar.delete()
+                name = user.avatar.name
+                user.avatar = None
+                user.avatar_renditions_ready = False
+                user.save(
+                    update_fields=['avatar', 'avatar_renditions_ready']
+                )
+                enqueue(
+                    delete_images, names=[name], renditions=AVATAR_RENDITIONS
+                )
             return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+class TagViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet для работы с тегами (только чтение)."""
 
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     pagination_class = None
+    cache_namespace = TAGS_CACHE_NAMESPACE
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet для работы с ингредиентами (только чтение)."""
 
     queryset = Ingredient.objects.all()
@@ -135,21 +230,45 @@ class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     pagination_class = None
     filter_backends = (DjangoFilterBackend,)
     filterset_class = IngredientFilter
+    cache_namespace = INGREDIENTS_CACHE_NAMESPACE
+
+    def list(self, request, *args, **kwargs):
+        """Ищет ингредиенты по индексу в памяти, не обращаясь к БД."""
+        return self.conditional_response(self._search, request)
 
+    def _search(self, request):
+        index = get_ingredient_index()
+        name = request.query_params.get('name')
+        if name is None:
+            return Response(index.all())
+        return Response(index.search(name))
 
-class RecipeViewSet(viewsets.ModelViewSet, CollectionActionMixin):
+
+class RecipeViewSet(AnonymousCacheMixin, viewsets.ModelViewSet,
+                    CollectionActionMixin):
     """ViewSet для полной работы с рецептами."""
 
     serializer_class = RecipeSerializer
     permission_classes = [IsAuthorOrReadOnly]
     pagination_class = CustomPagination
-    filter_backends = (DjangoFilterBackend, filters.OrderingFilter)
+    filter_backends = (DjangoFilterBackend, RecipeOrderingFilter)
     filterset_class = RecipeFilter
+    # RecipeReadSerializer не объявляет полей, поэтому допустимые
+    # поля сортировки перечисляются явно.
+    ordering_fields = ('id', 'name', 'cooking_time', 'pub_date', 'author')
     ordering = ('-pub_date',)
+    cursor_ordering = ('-pub_date', '-id')
+    cache_namespace = RECIPES_CACHE_NAMESPACE
+    cache_timeout = ANONYMOUS_CACHE_TIMEOUT
 
     def get_queryset(self):
-        """Возвращает базовый QuerySet с оптимизацией запросов."""
-        queryset = Recipe.objects.select_related('author').prefetch_related(
+        """
+        Возвращает базовый QuerySet с оптимизацией запросов.
+
+        Поисковый вектор нужен только в условиях поиска, поэтому
+        в выборку не загружается.
+        """
+        queryset = Recipe.objects.defer('search_vector').prefetch_related(
             'tags',
             Prefetch(
                 'recipe_ingredients',
@@ -158,28 +277,56 @@ class RecipeViewSet(viewsets.ModelViewSet, CollectionActionMixin):
         )
 
         user = self.request.user
-        if user.is_authenticated:
-            queryset = queryset.annotate(
-                is_favorited=Exists(
-                    Favorite.objects.filter(
-                        user=user, recipe=OuterRef('pk')
-                    )
-                ),
-                is_in_shopping_cart=Exists(
-                    ShoppingCart.objects.filter(
-                        user=user, recipe=OuterRef('pk')
-                    )
+        if not user.is_authenticated:
+            return queryset.select_related('author')
+
+        return queryset.prefetch_related(
+            Prefetch(
+                'author',
+                queryset=User.objects.annotate(
+                    is_subscribed=is_subscribed_expression(user)
                 )
             )
-
-        return queryset
+        ).annotate(
+            is_favorited=Exists(
+                Favorite.objects.filter(
+                    user=user, recipe=OuterRef('pk')
+                )
+            ),
+            is_in_shopping_cart=Exists(
+                ShoppingCart.objects.filter(
+                    user=user, recipe=OuterRef('pk')
+                )
+            )
+        )
 
     def get_serializer_class(self):
         """Возвращает класс сериализатора в зависимости от действия."""
         if self.action in ['create', 'update', 'partial_update']:
             return RecipeCreateSerializer
+        if self.action in ['list', 'retrieve']:
+            return RecipeReadSerializer
         return RecipeSerializer
 
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        """Удаляет рецепт, обновляя списки покупок и счётчик автора."""
+        amounts = instance.recipe_ingredients.values_list(
+            'ingredient_id', 'amount'
+        )
+        ShoppingCartIngredient.objects.change_recipe(
+            instance.id,
+            {ingredient_id: -amount for ingredient_id, amount in amounts}
+        )
+        change_counter(
+            User.objects.filter(pk=instance.author_id), 'recipes_count', -1
+        )
+        enqueue(
+            delete_images, names=[instance.image.name],
+            renditions=RECIPE_RENDITIONS
+        )
+        instance.delete()
+
     @action(
         detail=True,
         methods=['post', 'delete'],
@@ -212,45 +359,78 @@ class RecipeViewSet(viewsets.ModelViewSet, CollectionActionMixin):
             error_not_found='Рецепт не в списке покупок'
         )
 
-    def _create_shopping_list_content(self, user):
-        """Создает содержимое списка покупок."""
-        ingredients = RecipeIngredient.objects.filter(
-            recipe__shoppingcart_by__user=user
-        ).values(
-            'ingredient__name', 'ingredient__measurement_unit'
-        ).annotate(
-            total_amount=Sum('amount')
-        ).order_by('ingredient__name')
+    @action(
+        detail=False,
+        methods=['post', 'delete'],
+        permission_classes=[permissions.IsAuthenticated],
+        url_path='favorite/bulk'
+    )
+    def favorite_bulk(self, request):
+        """Добавляет/удаляет несколько рецептов в избранное."""
+        return self.handle_bulk_collection_action(request, Favorite)
 
-        shopping_list = [
-            'Список покупок\n\n'
-        ]
+    @action(
+        detail=False,
+        methods=['post', 'delete'],
+        permission_classes=[permissions.IsAuthenticated],
+        url_path='shopping_cart/bulk'
+    )
+    def shopping_cart_bulk(self, request):
+        """Добавляет/удаляет несколько рецептов в список покупок."""
+        return self.handle_bulk_collection_action(request, ShoppingCart)
+
+    def _iter_shopping_list(self, user, file_format):
+        """
+        Построчно формирует список покупок.
+
+        Суммы по ингредиентам заранее накоплены в ShoppingCartIngredient
+        и читаются серверным курсором порциями, поэтому память не зависит
+        от размера списка.
+        """
+        ingredients = ShoppingCartIngredient.objects.filter(
+            user=user
+        ).values(
+            'ingredient__name', 'ingredient__measurement_unit', 'amount'
+        ).order_by('ingredient__name').iterator(
+            chunk_size=SHOPPING_LIST_CHUNK_SIZE
+        )
 
+        if file_format == CSVRenderer.format:
+            writer = csv.writer(EchoBuffer())
+            yield writer.writerow(
+                ('Ингредиент', 'Единица измерения', 'Количество')
+            )
+            for item in ingredients:
+                yield writer.writerow((
+                    item['ingredient__name'],
+                    item['ingredient__measurement_unit'],
+                    item['amount'],
+                ))
+            return
+
+        yield 'Список покупок\n\n'
         for item in ingredients:
             name = item['ingredient__name']
             unit = item['ingredient__measurement_unit']
-            amount = item['total_amount']
-            shopping_list.append(f'{name} ({unit}) — {amount}\n')
-
-        return ''.join(shopping_list)
+            amount = item['amount']
+            yield f'{name} ({unit}) — {amount}\n'
 
     @action(
         detail=False,
         methods=['get'],
-        permission_classes=[permissions.IsAuthenticated]
+        permission_classes=[permissions.IsAuthenticated],
+        renderer_classes=[PlainTextRenderer, CSVRenderer]
     )
     def download_shopping_cart(self, request):
-        """Скачивает список покупок пользователя в формате txt."""
-        user = request.user
-        content = self._create_shopping_list_content(user)
-
-        response = HttpResponse(
-            content=content,
-            content_type='text/plain'
+        """Скачивает список покупок пользователя в формате txt или csv."""
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            self._iter_shopping_list(request.user, renderer.format),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}'
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="shopping_list.{renderer.format}"'
         )
-        response['Content-Disposition'] = ('attachment; '
-                                           'filename="shopping_list.txt"'
-                                           )
         return response
 
     @action(detail=True, methods=['get'], url_path='get-link')
@@ -0,0 +1,37 @@
+import statistics
+import time
+
+
+def measure(func, repeat):
+    """Выполняет функцию repeat раз и возвращает время вызовов в мс."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def percentile(timings, percent):
+    """Возвращает перцентиль по методу ближайшего ранга."""
+    ordered = sorted(timings)
+    index = max(0, round(percent / 100 * len(ordered) + 0.5) - 1)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+def summarize(timings):
+    """Сводная статистика по замерам времени в мс."""
+    return {
+        'mean': statistics.mean(timings),
+        'p50': percentile(timings, 50),
+        'p95': percentile(timings, 95),
+        'p99': percentile(timings, 99),
+    }
+
+
+def format_summary(title, summary):
+    """Форматирует сводную статистику в одну строку отчёта."""
+    values = ' '.join(
+        f'{name}={value:.3f}ms' for name, value in summary.items()
+    )
+    return f'{title}: {values}'
@@ -0,0 +1,40 @@
+import time
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY_TEMPLATE = 'foodgram:version:{}'
+
+
+def get_cache_version(namespace):
+    """
+    Возвращает текущую версию данных пространства имён.
+
+    Версия хранится в кеше Django, поэтому при общем кеше она одинакова
+    для всех процессов. Если версии ещё нет, она создаётся атомарно.
+    """
+    key = VERSION_KEY_TEMPLATE.format(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_cache_version(namespace):
+    """Помечает все данные пространства имён как устаревшие."""
+    cache.set(
+        VERSION_KEY_TEMPLATE.format(namespace), time.time_ns(), timeout=None
+    )
+
+
+def invalidate(*namespaces):
+    """
+    Сбрасывает версии кеша после фиксации транзакции.
+
+    Если сбросить версию до COMMIT, параллельный запрос успеет
+    закешировать ещё старые данные уже под новой версией.
+    """
+    for namespace in namespaces:
+        transaction.on_commit(partial(bump_cache_version, namespace))
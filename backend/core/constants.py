@@ -11,3 +11,29 @@ MAX_SLUG_LENGTH = 32
 MAX_TAG_LENGTH = 32
 
 MAX_RECIPE_NAME_LENGTH = 256
+
+INGREDIENT_SEARCH_LIMIT = 100
+
+INGREDIENTS_CACHE_NAMESPACE = 'ingredients'
+
+TAGS_CACHE_NAMESPACE = 'tags'
+
+RECIPES_CACHE_NAMESPACE = 'recipes'
+
+ANONYMOUS_CACHE_TIMEOUT = 60 * 60
+
+RENDERED_CACHE_TIMEOUT = 60 * 60 * 24
+
+SHOPPING_LIST_CHUNK_SIZE = 2000
+
+JOB_MAX_ATTEMPTS = 5
+
+JOB_RETRY_BASE_DELAY = 10
+
+JOB_RETRY_MAX_DELAY = 60 * 60
+
+JOB_STALE_TIMEOUT = 15 * 60
+
+BULK_RELATIONS_LIMIT = 100
+
+MAX_PK_VALUE = 2 ** 63 - 1
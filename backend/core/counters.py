@@ -0,0 +1,37 @@
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+
+
+def change_counter(queryset, field, delta):
+    """
+    Атомарно изменяет денормализованный счётчик у строк queryset.
+
+    Изменение выполняется одним UPDATE с выражением F(), поэтому
+    конкурентные запросы не теряют инкременты; счётчик не опускается
+    ниже нуля.
+    """
+    return queryset.update(**{field: Greatest(F(field) + delta, Value(0))})
+
+
+class CounterFieldsMixin:
+    """
+    Примесь модели с денормализованными счётчиками.
+
+    Счётчики меняются только через change_counter, поэтому полное
+    сохранение уже существующей строки записывает все поля, кроме
+    счётчиков и отложенных полей, и не затирает свежие значения
+    устаревшими из памяти.
+    """
+
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if (not args and not self._state.adding
+                and kwargs.get('update_fields') is None
+                and not kwargs.get('force_insert')):
+            excluded = {*self.counter_fields, *self.get_deferred_fields()}
+            kwargs['update_fields'] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in excluded
+            ]
+        super().save(*args, **kwargs)
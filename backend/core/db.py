@@ -0,0 +1,62 @@
+from django.db import connection
+
+
+def insert_ignore_conflict(model, **values):
+    """
+    Вставляет строку, если она не нарушает ограничений уникальности.
+
+    Выполняет один INSERT ... ON CONFLICT DO NOTHING RETURNING, поэтому
+    проверка и вставка не разделены гонкой. Возвращает первичный ключ
+    новой строки или None, если такая строка уже есть.
+    """
+    quote_name = connection.ops.quote_name
+    meta = model._meta
+    fields = [meta.get_field(name) for name in values]
+    columns = ', '.join(quote_name(field.column) for field in fields)
+    placeholders = ', '.join(['%s'] * len(fields))
+    params = [
+        field.get_db_prep_save(values[name], connection)
+        for name, field in zip(values, fields)
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {quote_name(meta.db_table)} ({columns}) '
+            f'VALUES ({placeholders}) ON CONFLICT DO NOTHING '
+            f'RETURNING {quote_name(meta.pk.column)}',
+            params
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def insert_ignore_conflicts(model, rows, returning):
+    """
+    Вставляет пакет строк, пропуская нарушающие уникальность.
+
+    rows — список словарей {имя поля: значение} с одинаковыми ключами.
+    Выполняет один INSERT ... ON CONFLICT DO NOTHING RETURNING и
+    возвращает значения поля returning только у реально вставленных
+    строк, поэтому строки, вставленные параллельно, не учитываются.
+    """
+    if not rows:
+        return []
+    quote_name = connection.ops.quote_name
+    meta = model._meta
+    names = list(rows[0])
+    fields = [meta.get_field(name) for name in names]
+    columns = ', '.join(quote_name(field.column) for field in fields)
+    placeholders = ', '.join(
+        ['(' + ', '.join(['%s'] * len(fields)) + ')'] * len(rows)
+    )
+    params = [
+        field.get_db_prep_save(row[name], connection)
+        for row in rows for name, field in zip(names, fields)
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {quote_name(meta.db_table)} ({columns}) '
+            f'VALUES {placeholders} ON CONFLICT DO NOTHING '
+            f'RETURNING {quote_name(meta.get_field(returning).column)}',
+            params
+        )
+        return [row[0] for row in cursor.fetchall()]
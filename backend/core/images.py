@@ -0,0 +1,126 @@
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, features
+
+from .cache import invalidate
+from .constants import RECIPES_CACHE_NAMESPACE
+
+RENDITION_FORMAT, RENDITION_EXTENSION = (
+    ('WEBP', 'webp') if features.check('webp') else ('JPEG', 'jpg')
+)
+RENDITION_QUALITY = 80
+
+RENDITIONS = {
+    'card': (480, 480),
+    'detail': (1280, 1280),
+    'avatar': (256, 256),
+}
+RECIPE_RENDITIONS = ('card', 'detail')
+AVATAR_RENDITIONS = ('avatar',)
+
+
+def rendition_name(name, rendition):
+    """Путь уменьшенной копии изображения в хранилище."""
+    path = PurePosixPath(name)
+    return str(
+        PurePosixPath('renditions', rendition, path.parent)
+        / f'{path.name}.{RENDITION_EXTENSION}'
+    )
+
+
+def rendition_url(name, rendition, storage=default_storage):
+    """
+    Адрес уменьшенной копии.
+
+    Адрес вычисляется по имени файла без обращения к хранилищу;
+    создана ли копия, хранит флаг <поле>_renditions_ready модели.
+    """
+    return storage.url(rendition_name(name, rendition))
+
+
+def renditions_ready(file):
+    """Созданы ли уменьшенные копии файла из поля модели."""
+    return getattr(file.instance, f'{file.field.name}_renditions_ready', False)
+
+
+def mark_renditions_ready(model, field, names):
+    """
+    Отмечает, что копии изображений созданы, и сбрасывает кеш рецептов.
+
+    model — метка модели вида 'recipes.Recipe'. Флаг ставится только
+    строкам, в которых поле всё ещё указывает на эти файлы. Строки
+    сохраняются через save(), чтобы сработали сигналы (в том числе
+    сброс кеша токенов для аватара). Кеш рецептов сбрасывается и для
+    аватаров: они есть в карточке автора.
+    """
+    flag = f'{field}_renditions_ready'
+    objects = apps.get_model(model)._default_manager.filter(
+        **{f'{field}__in': names, flag: False}
+    )
+    updated = 0
+    for obj in objects:
+        setattr(obj, flag, True)
+        obj.save(update_fields=[flag])
+        updated += 1
+    if updated:
+        invalidate(RECIPES_CACHE_NAMESPACE)
+    return updated
+
+
+def generate_renditions(name, renditions, storage=default_storage,
+                        force=True):
+    """
+    Создаёт уменьшенные копии изображения.
+
+    Копии вписываются в размеры из RENDITIONS с сохранением пропорций
+    и перекодируются в WebP (или в оптимизированный JPEG, если Pillow
+    собран без WebP). Возвращает список созданных файлов.
+    """
+    targets = [
+        (rendition, rendition_name(name, rendition))
+        for rendition in renditions
+    ]
+    if not force:
+        targets = [
+            (rendition, path) for rendition, path in targets
+            if not storage.exists(path)
+        ]
+    if not targets:
+        return []
+
+    with storage.open(name, 'rb') as source:
+        image = ImageOps.exif_transpose(Image.open(source))
+        image.load()
+    if RENDITION_FORMAT == 'JPEG' or image.mode not in ('RGB', 'RGBA'):
+        has_alpha = 'A' in image.getbands() or 'transparency' in image.info
+        mode = 'RGBA' if has_alpha and RENDITION_FORMAT == 'WEBP' else 'RGB'
+        image = image.convert(mode)
+
+    created = []
+    for rendition, path in targets:
+        copy = image.copy()
+        copy.thumbnail(RENDITIONS[rendition], Image.LANCZOS)
+        buffer = BytesIO()
+        copy.save(
+            buffer, RENDITION_FORMAT, quality=RENDITION_QUALITY,
+            optimize=True, **(
+                {'method': 4} if RENDITION_FORMAT == 'WEBP'
+                else {'progressive': True}
+            )
+        )
+        if storage.exists(path):
+            storage.delete(path)
+        created.append(storage.save(path, ContentFile(buffer.getvalue())))
+    return created
+
+
+def delete_renditions(name, renditions, storage=default_storage):
+    """Удаляет уменьшенные копии изображения."""
+    for rendition in renditions:
+        path = rendition_name(name, rendition)
+        if storage.exists(path):
+            storage.delete(path)
@@ -0,0 +1,166 @@
+import json
+import os
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from pathlib import Path
+from threading import Lock
+
+from django.conf import settings
+
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+METRICS = {
+    'http_request_duration_seconds': (
+        'histogram', 'Время обработки запроса по действию представления'
+    ),
+    'http_responses_total': ('counter', 'Ответы по действию и статусу'),
+    'db_queries_total': ('counter', 'SQL-запросы по действию'),
+    'cache_requests_total': (
+        'counter', 'Обращения к кешу ответов по результату'
+    ),
+}
+PREFIX = 'foodgram_'
+
+
+class MetricsStore:
+    """
+    Метрики процесса с периодическим сбросом в файл.
+
+    Каждый процесс gunicorn накапливает значения с момента запуска
+    в памяти и не чаще раза в METRICS_FLUSH_INTERVAL секунд атомарно
+    перезаписывает свой файл в METRICS_DIR. Эндпоинт /metrics суммирует
+    файлы всех процессов, поэтому счётчики не теряются при перезапуске
+    воркеров. Каталог очищается при старте контейнера в entrypoint.sh,
+    чтобы файлы прошлых запусков не суммировались повторно.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.counters = defaultdict(float)
+        self.histograms = {}
+        self.flushed_at = 0.0
+        self.file_name = f'{os.getpid()}-{time.time_ns()}.json'
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] += value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.setdefault(
+                key, [0] * (len(DURATION_BUCKETS) + 1) + [0.0]
+            )
+            histogram[bisect_left(DURATION_BUCKETS, value)] += 1
+            histogram[-1] += value
+
+    def flush(self, force=False):
+        now = time.monotonic()
+        if not force and now - self.flushed_at < (
+            settings.METRICS_FLUSH_INTERVAL
+        ):
+            return
+        with self.lock:
+            # После fork (gunicorn --preload) у процесса должен быть свой файл.
+            if not self.file_name.startswith(f'{os.getpid()}-'):
+                self.file_name = f'{os.getpid()}-{time.time_ns()}.json'
+            data = {
+                'counters': [
+                    [name, labels, value]
+                    for (name, labels), value in self.counters.items()
+                ],
+                'histograms': [
+                    [name, labels, values]
+                    for (name, labels), values in self.histograms.items()
+                ],
+            }
+            self.flushed_at = now
+        directory = Path(settings.METRICS_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / self.file_name
+        temporary = path.with_suffix('.tmp')
+        temporary.write_text(json.dumps(data), encoding='utf-8')
+        os.replace(temporary, path)
+
+
+store = MetricsStore()
+
+
+def collect():
+    """Суммирует файлы метрик всех процессов."""
+    counters = defaultdict(float)
+    histograms = {}
+    for path in Path(settings.METRICS_DIR).glob('*.json'):
+        try:
+            data = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            continue
+        for name, labels, value in data['counters']:
+            counters[name, tuple(map(tuple, labels))] += value
+        for name, labels, values in data['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            total = histograms.setdefault(key, [0] * len(values))
+            for index, value in enumerate(values):
+                total[index] += value
+    return counters, histograms
+
+
+def format_value(value):
+    """Целые значения выводит точно, остальные — через repr(float)."""
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def format_labels(labels, **extra):
+    pairs = [*labels, *extra.items()]
+    if not pairs:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"')
+         .replace('\n', '\\n'))
+        for name, value in pairs
+    )
+    return '{%s}' % ','.join(f'{name}="{value}"' for name, value in escaped)
+
+
+def render():
+    """Отдаёт метрики в текстовом формате Prometheus."""
+    store.flush(force=True)
+    counters, histograms = collect()
+    lines = []
+    for name, (metric_type, description) in METRICS.items():
+        full_name = PREFIX + name
+        lines.append(f'# HELP {full_name} {description}')
+        lines.append(f'# TYPE {full_name} {metric_type}')
+        if metric_type == 'counter':
+            for (key, labels), value in sorted(counters.items()):
+                if key == name:
+                    lines.append(
+                        f'{full_name}{format_labels(labels)} '
+                        f'{format_value(value)}'
+                    )
+            continue
+        for (key, labels), values in sorted(histograms.items()):
+            if key != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(
+                [*map(str, DURATION_BUCKETS), '+Inf'], values
+            ):
+                cumulative += count
+                lines.append(
+                    f'{full_name}_bucket{format_labels(labels, le=bound)} '
+                    f'{cumulative}'
+                )
+            lines.append(
+                f'{full_name}_sum{format_labels(labels)} '
+                f'{format_value(values[-1])}'
+            )
+            lines.append(
+                f'{full_name}_count{format_labels(labels)} {cumulative}'
+            )
+    return '\n'.join(lines) + '\n'
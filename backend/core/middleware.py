@@ -0,0 +1,151 @@
+import json
+import logging
+import random
+import re
+from collections import Counter
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDER_LIST = re.compile(r'%s(?:\s*,\s*%s)+')
+
+
+def fingerprint(sql):
+    """Сводит списки параметров IN (%s, %s, ...) к одному %s."""
+    return PLACEHOLDER_LIST.sub('%s', sql)
+
+
+class QueryStats:
+    """Обёртка execute_wrapper, считающая запросы и время в БД."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += perf_counter() - start
+            self.count += 1
+            self.statements[sql] += 1
+
+    def duplicates(self, threshold):
+        """Повторяющиеся запросы — кандидаты в N+1."""
+        fingerprints = Counter()
+        for sql, count in self.statements.items():
+            fingerprints[fingerprint(sql)] += count
+        return [
+            (sql, count) for sql, count in fingerprints.most_common()
+            if count >= threshold
+        ]
+
+
+class SQLInstrumentationMiddleware:
+    """
+    Считает SQL-запросы и время в БД для каждого запроса к API.
+
+    Включается настройкой SQL_INSTRUMENTATION и работает без DEBUG:
+    запросы перехватываются через connection.execute_wrapper.
+    Добавляет заголовок Server-Timing и пишет строку JSON в лог, если
+    запрос превысил SLOW_REQUEST_MS, SLOW_REQUEST_QUERIES или один
+    и тот же запрос повторился SQL_DUPLICATE_THRESHOLD раз.
+    SQL_INSTRUMENTATION_SAMPLE_RATE задаёт долю измеряемых запросов.
+    Запросы, выполняемые при потоковой отдаче ответа, не учитываются.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SQL_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = settings.SQL_INSTRUMENTATION_SAMPLE_RATE
+
+    def __call__(self, request):
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        stats = QueryStats()
+        start = perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            response = self.get_response(request)
+        total_ms = (perf_counter() - start) * 1000
+        db_ms = stats.duration * 1000
+
+        response['Server-Timing'] = (
+            f'db;desc="{stats.count} queries";dur={db_ms:.1f}, '
+            f'app;dur={total_ms - db_ms:.1f}'
+        )
+        duplicates = stats.duplicates(settings.SQL_DUPLICATE_THRESHOLD)
+        if (
+            total_ms >= settings.SLOW_REQUEST_MS
+            or stats.count >= settings.SLOW_REQUEST_QUERIES
+            or duplicates
+        ):
+            self.log(request, response, total_ms, db_ms, stats, duplicates)
+        return response
+
+    def log(self, request, response, total_ms, db_ms, stats, duplicates):
+        match = request.resolver_match
+        logger.warning(json.dumps({
+            'event': 'slow_request',
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'duration_ms': round(total_ms, 1),
+            'db_ms': round(db_ms, 1),
+            'queries': stats.count,
+            'duplicates': [
+                {'sql': sql[:300], 'count': count}
+                for sql, count in duplicates
+            ],
+        }, ensure_ascii=False))
+
+
+class MetricsMiddleware:
+    """
+    Собирает метрики запросов для эндпоинта /metrics.
+
+    Действие представления берётся из имени маршрута (например,
+    api:recipes-list), а не из пути, чтобы число рядов не росло
+    с числом рецептов и пользователей.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = QueryStats()
+        start = perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            response = self.get_response(request)
+        duration = perf_counter() - start
+
+        match = request.resolver_match
+        view = match.view_name if match else 'unmatched'
+        metrics.store.observe(
+            'http_request_duration_seconds', duration,
+            view=view, method=request.method
+        )
+        metrics.store.inc(
+            'http_responses_total',
+            view=view, method=request.method, status=response.status_code
+        )
+        metrics.store.inc('db_queries_total', stats.count, view=view)
+        metrics.store.flush()
+        return response
@@ -0,0 +1,27 @@
+from django.core.files.storage import default_storage
+from jobs.registry import task
+
+from . import images
+
+
+@task('images.generate_renditions')
+def generate_renditions(name, renditions, model=None, field=None):
+    """
+    Создаёт уменьшенные копии загруженного изображения.
+
+    Если переданы model и field, после создания копий у строки модели
+    ставится флаг <field>_renditions_ready.
+    """
+    if default_storage.exists(name):
+        images.generate_renditions(name, renditions)
+        if model:
+            images.mark_renditions_ready(model, field, [name])
+
+
+@task('images.delete')
+def delete_images(names, renditions=()):
+    """Удаляет изображения вместе с их уменьшенными копиями."""
+    for name in names:
+        images.delete_renditions(name, renditions)
+        if default_storage.exists(name):
+            default_storage.delete(name)
@@ -27,6 +27,9 @@ do
   sleep 2
 done
 
+echo "Очистка метрик прошлого запуска..."
+rm -rf "${METRICS_DIR:-/tmp/foodgram-metrics}"
+
 echo "Запуск миграций..."
 python manage.py migrate --noinput
 
@@ -0,0 +1,17 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'name', 'status', 'attempts', 'run_at', 'finished_at', 'duration_ms'
+    )
+    list_display_links = ('name',)
+    list_filter = ('status', 'name')
+    search_fields = ('name',)
+    readonly_fields = (
+        'created_at', 'started_at', 'finished_at', 'duration_ms',
+        'last_error'
+    )
@@ -0,0 +1,69 @@
+import signal
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from time import sleep
+
+from core.benchmark import format_summary, summarize
+from django.core.management import BaseCommand
+from django.db import connections
+from django.utils import timezone
+from jobs.worker import claim_jobs, purge_jobs, run_job
+
+
+class Command(BaseCommand):
+    """Запускает обработчики фоновых задач."""
+
+    help = 'Выполняет задачи из фоновой очереди'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads', type=int, default=4,
+            help='Число потоков-обработчиков'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Пауза между опросами пустой очереди, с'
+        )
+        parser.add_argument(
+            '--keep-done', type=int, default=24,
+            help='Сколько часов хранить выполненные задачи'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и завершиться'
+        )
+
+    def handle(self, *args, **options):
+        self.running = True
+        signal.signal(signal.SIGTERM, self.stop)
+        threads = options['threads']
+        timings = defaultdict(list)
+        failures = defaultdict(int)
+
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            try:
+                while self.running:
+                    jobs = claim_jobs(threads * 2)
+                    for name, duration, ok in pool.map(run_job, jobs):
+                        timings[name].append(duration)
+                        failures[name] += not ok
+                    if jobs:
+                        continue
+                    purge_jobs(
+                        timezone.now() - timedelta(hours=options['keep_done'])
+                    )
+                    if options['once']:
+                        break
+                    connections.close_all()
+                    sleep(options['poll_interval'])
+            except KeyboardInterrupt:
+                pass
+
+        for name, durations in sorted(timings.items()):
+            self.stdout.write(format_summary(
+                f'{name} (ошибок: {failures[name]})', summarize(durations)
+            ))
+
+    def stop(self, signum, frame):
+        self.running = False
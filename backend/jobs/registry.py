@@ -0,0 +1,33 @@
+from functools import partial
+
+from core.constants import JOB_MAX_ATTEMPTS
+from django.db import transaction
+
+from .models import Job
+
+TASKS = {}
+
+
+def task(name, max_attempts=JOB_MAX_ATTEMPTS):
+    """Регистрирует функцию как фоновую задачу с именем name."""
+    def register(func):
+        func.job_name = name
+        func.max_attempts = max_attempts
+        TASKS[name] = func
+        return func
+    return register
+
+
+def enqueue(func, **payload):
+    """
+    Ставит задачу в очередь после фиксации текущей транзакции.
+
+    Если транзакция откатится, задача не появится, а воркер
+    не увидит данных, которых ещё нет в базе.
+    """
+    transaction.on_commit(partial(
+        Job.objects.create,
+        name=func.job_name,
+        payload=payload,
+        max_attempts=func.max_attempts,
+    ))
@@ -0,0 +1,115 @@
+import logging
+import traceback
+from datetime import timedelta
+from time import perf_counter
+
+from core.constants import (JOB_RETRY_BASE_DELAY, JOB_RETRY_MAX_DELAY,
+                            JOB_STALE_TIMEOUT)
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+from .registry import TASKS
+
+logger = logging.getLogger(__name__)
+
+
+def retry_delay(attempts):
+    """Экспоненциальная задержка перед повтором попытки attempts."""
+    return min(
+        JOB_RETRY_BASE_DELAY * 2 ** (attempts - 1), JOB_RETRY_MAX_DELAY
+    )
+
+
+def claim_jobs(limit):
+    """
+    Забирает до limit готовых к запуску задач.
+
+    Задачи, зависшие в статусе «выполняется» дольше JOB_STALE_TIMEOUT
+    (например, после падения воркера), забираются повторно, пока не
+    исчерпан max_attempts; после этого они помечаются ошибкой, чтобы
+    задача, роняющая воркер, не перезапускалась бесконечно.
+    SKIP LOCKED позволяет нескольким воркерам не мешать друг другу.
+    """
+    now = timezone.now()
+    stale = Q(
+        status=Job.RUNNING,
+        started_at__lt=now - timedelta(seconds=JOB_STALE_TIMEOUT)
+    )
+    with transaction.atomic():
+        exhausted = list(
+            Job.objects.select_for_update(skip_locked=True).filter(
+                stale, attempts__gte=F('max_attempts')
+            ).values_list('pk', flat=True)
+        )
+        if exhausted:
+            Job.objects.filter(pk__in=exhausted).update(
+                status=Job.FAILED, finished_at=now,
+                last_error='Воркер не завершил задачу за '
+                           f'{JOB_STALE_TIMEOUT} с, попытки исчерпаны'
+            )
+            logger.warning(
+                'Зависшие задачи помечены ошибкой: %s', exhausted
+            )
+        ids = list(
+            Job.objects.select_for_update(skip_locked=True).filter(
+                Q(status=Job.PENDING, run_at__lte=now)
+                | (stale & Q(attempts__lt=F('max_attempts')))
+            ).order_by('run_at').values_list('pk', flat=True)[:limit]
+        )
+        Job.objects.filter(pk__in=ids).update(
+            status=Job.RUNNING, started_at=now, attempts=F('attempts') + 1
+        )
+    return list(Job.objects.filter(pk__in=ids).order_by('run_at'))
+
+
+def run_job(job):
+    """Выполняет задачу и записывает результат и длительность."""
+    close_old_connections()
+    start = perf_counter()
+    try:
+        func = TASKS.get(job.name)
+        if func is None:
+            raise LookupError(f'Неизвестная задача: {job.name}')
+        func(**job.payload)
+    except Exception as error:
+        duration = (perf_counter() - start) * 1000
+        logger.warning(
+            'Задача %s #%s: попытка %s завершилась ошибкой: %s',
+            job.name, job.pk, job.attempts, error
+        )
+        fields = {
+            'finished_at': timezone.now(),
+            'duration_ms': duration,
+            'last_error': traceback.format_exc(),
+        }
+        if job.attempts < job.max_attempts:
+            fields.update(
+                status=Job.PENDING,
+                run_at=timezone.now() + timedelta(
+                    seconds=retry_delay(job.attempts)
+                ),
+            )
+        else:
+            fields['status'] = Job.FAILED
+        Job.objects.filter(pk=job.pk).update(**fields)
+        return job.name, duration, False
+    else:
+        duration = (perf_counter() - start) * 1000
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.DONE, finished_at=timezone.now(),
+            duration_ms=duration, last_error=''
+        )
+        logger.info('Задача %s #%s: %.1f мс', job.name, job.pk, duration)
+        return job.name, duration, True
+    finally:
+        close_old_connections()
+
+
+def purge_jobs(older_than):
+    """Удаляет выполненные задачи, завершённые раньше older_than."""
+    deleted, _ = Job.objects.filter(
+        status=Job.DONE, finished_at__lt=older_than
+    ).delete()
+    return deleted
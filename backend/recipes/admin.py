@@ -1,5 +1,4 @@
 from django.contrib import admin
-from django.db.models import Count
 
 from .models import (Favorite, Ingredient, Recipe, RecipeIngredient,
                      ShoppingCart, Tag)
@@ -13,7 +12,10 @@ class RecipeIngredientInline(admin.TabularInline):
 
 @admin.register(Recipe)
 class RecipeAdmin(admin.ModelAdmin):
-    list_display = ('name', 'author', 'favorites_count', 'pub_date')
+    list_display = (
+        'name', 'author', 'favorites_count', 'shopping_carts_count',
+        'pub_date'
+    )
     list_display_links = ('name',)
     list_filter = ('author', 'name', 'tags')
     search_fields = ('name', 'author__username', 'author__email')
@@ -25,12 +27,7 @@ class RecipeAdmin(admin.ModelAdmin):
         return queryset.select_related('author').prefetch_related(
             'tags',
             'recipe_ingredients__ingredient'
-        ).annotate(favorites_count=Count('favorite_by'))
-
-    def favorites_count(self, obj):
-        return obj.favorites_count
-
-    favorites_count.short_description = 'В избранном'
+        )
 
 
 @admin.register(Tag)
@@ -0,0 +1,70 @@
+import random
+
+from core.cache import bump_cache_version
+from core.constants import TAGS_CACHE_NAMESPACE
+from users.models import User
+
+from .models import Ingredient, Recipe, RecipeIngredient, Tag
+
+INGREDIENTS_PER_RECIPE = 8
+
+
+def create_recipes(count, seed=0, authors=1):
+    """
+    Создаёт синтетические рецепты для замеров.
+
+    Рецепты распределяются по authors авторам. Возвращает список авторов
+    и отдельного пользователя-читателя. Вызывать внутри транзакции,
+    которая затем откатывается.
+    """
+    rng = random.Random(seed)
+    viewer, *authors = (
+        User.objects.create_user(
+            email=f'{name}@foodgram.local', username=name,
+            first_name=name, last_name=name
+        )
+        for name in ['benchmark-viewer'] + [
+            f'benchmark-author-{number}' for number in range(authors)
+        ]
+    )
+    Tag.objects.bulk_create(
+        Tag(name=f'benchmark-{number}', slug=f'benchmark-{number}')
+        for number in range(3)
+    )
+    # Сигналы при bulk_create не срабатывают, а словарь тегов
+    # должен увидеть новые теги уже внутри транзакции.
+    bump_cache_version(TAGS_CACHE_NAMESPACE)
+    Ingredient.objects.bulk_create(
+        Ingredient(name=f'benchmark-{number}', measurement_unit='г')
+        for number in range(50)
+    )
+    Recipe.objects.bulk_create(
+        Recipe(
+            author=authors[number % len(authors)],
+            name=f'Рецепт {number}', text='Описание',
+            image='recipes/images/benchmark.png',
+            cooking_time=rng.randint(5, 180)
+        )
+        for number in range(count)
+    )
+    # bulk_create возвращает id только в PostgreSQL.
+    tags = list(Tag.objects.filter(slug__startswith='benchmark-'))
+    ingredients = list(
+        Ingredient.objects.filter(name__startswith='benchmark-')
+    )
+    recipes = list(Recipe.objects.filter(author__in=authors))
+    Recipe.tags.through.objects.bulk_create(
+        Recipe.tags.through(recipe=recipe, tag=tag)
+        for recipe in recipes for tag in rng.sample(tags, 2)
+    )
+    RecipeIngredient.objects.bulk_create(
+        RecipeIngredient(
+            recipe=recipe, ingredient=ingredient, amount=rng.randint(1, 500)
+        )
+        for recipe in recipes
+        for ingredient in rng.sample(ingredients, INGREDIENTS_PER_RECIPE)
+    )
+    for number, author in enumerate(authors):
+        author.recipes_count = len(range(number, count, len(authors)))
+    User.objects.bulk_update(authors, ['recipes_count'])
+    return authors, viewer
@@ -0,0 +1,63 @@
+import random
+
+from api.filters import IngredientFilter
+from api.serializers import IngredientSerializer
+from core.benchmark import format_summary, measure, summarize
+from django.core.management import BaseCommand, CommandError
+from recipes.models import Ingredient
+from recipes.search import IngredientSearchIndex
+
+
+class Command(BaseCommand):
+    """Сравнивает поиск ингредиентов по индексу в памяти и через ORM."""
+
+    help = 'Замеряет задержку автодополнения ингредиентов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--queries', type=int, default=200,
+            help='Количество поисковых запросов'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Зерно генератора поисковых запросов'
+        )
+
+    def handle(self, *args, **options):
+        names = list(Ingredient.objects.values_list('name', flat=True))
+        if not names:
+            raise CommandError(
+                'Нет ингредиентов, выполните load_data_ingredients'
+            )
+
+        rng = random.Random(options['seed'])
+        queries = [
+            name[:rng.randint(1, 4)]
+            for name in rng.choices(names, k=options['queries'])
+        ]
+        index = IngredientSearchIndex.from_database()
+
+        def orm_search():
+            query = queries[orm_search.calls % len(queries)]
+            orm_search.calls += 1
+            queryset = IngredientFilter(
+                {'name': query}, queryset=Ingredient.objects.all()
+            ).qs
+            return IngredientSerializer(queryset, many=True).data
+
+        def index_search():
+            query = queries[index_search.calls % len(queries)]
+            index_search.calls += 1
+            return index.search(query)
+
+        orm_search.calls = index_search.calls = 0
+        orm = summarize(measure(orm_search, len(queries)))
+        memory = summarize(measure(index_search, len(queries)))
+
+        self.stdout.write(f'Ингредиентов: {len(names)}, '
+                          f'запросов: {len(queries)}')
+        self.stdout.write(format_summary('ORM', orm))
+        self.stdout.write(format_summary('Индекс', memory))
+        self.stdout.write(self.style.SUCCESS(
+            f'Ускорение по медиане: {orm["p50"] / memory["p50"]:.1f}x'
+        ))
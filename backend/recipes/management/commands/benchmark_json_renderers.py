@@ -0,0 +1,77 @@
+from api.renderers import FastJSONRenderer, orjson
+from api.serializers import RecipeReadSerializer
+from api.views import RecipeViewSet
+from core.benchmark import format_summary, measure, summarize
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+from django.test import override_settings
+from recipes.benchmark import create_recipes
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+PAGE_SIZES = (50, 200, 1000)
+
+
+class Command(BaseCommand):
+    """Сравнивает JSONRenderer и FastJSONRenderer на страницах рецептов."""
+
+    help = 'Замеряет рендеринг JSON для больших страниц рецептов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=PAGE_SIZES,
+            help='Размеры страниц'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=50,
+            help='Количество повторов для каждой страницы'
+        )
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            raise CommandError('orjson не установлен')
+        # Синтетические данные откатываются вместе с транзакцией.
+        with transaction.atomic():
+            _, viewer = create_recipes(max(options['sizes']))
+            pages = self._serialize(viewer, options['sizes'])
+            transaction.set_rollback(True)
+
+        renderers = (('json', JSONRenderer()), ('orjson', FastJSONRenderer()))
+        with override_settings(JSON_BACKEND='orjson'):
+            for size, data in pages:
+                outputs = set()
+                for title, renderer in renderers:
+                    body = renderer.render(data)
+                    timings = measure(
+                        lambda: renderer.render(data), options['repeat']
+                    )
+                    outputs.add(body)
+                    summary = summarize(timings)
+                    throughput = len(body) / summary['mean'] / 1000
+                    self.stdout.write(
+                        format_summary(f'{size} рецептов, {title}', summary)
+                        + f' {len(body)} байт, {throughput:.1f} МБ/с'
+                    )
+                if len(outputs) != 1:
+                    raise CommandError(f'{size} рецептов: вывод различается')
+
+    def _serialize(self, user, sizes):
+        request = Request(APIRequestFactory().get('/api/recipes/'))
+        request.user = user
+        view = RecipeViewSet(
+            request=request, action='list', format_kwarg=None, kwargs={}
+        )
+        context = {'request': request, 'view': view}
+        queryset = view.get_queryset().order_by('-pub_date')
+        return [
+            (size, {
+                'count': size,
+                'next': None,
+                'previous': None,
+                'results': RecipeReadSerializer(
+                    queryset[:size], many=True, context=context
+                ).data,
+            })
+            for size in sizes
+        ]
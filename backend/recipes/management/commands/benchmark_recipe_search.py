@@ -0,0 +1,123 @@
+import json
+import random
+
+from api.filters import RecipeFilter
+from core.benchmark import format_summary, measure, summarize
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+from recipes.models import Recipe
+from users.models import User
+
+WORDS = (
+    'борщ', 'суп', 'салат', 'пирог', 'котлеты', 'картофель', 'курица',
+    'говядина', 'рыба', 'лосось', 'грибы', 'сыр', 'томаты', 'огурцы',
+    'тыква', 'морковь', 'шоколад', 'вишня', 'яблоки', 'творог', 'блины',
+    'запечённый', 'жареный', 'тушёный', 'домашний', 'острый', 'сливочный',
+    'быстрый', 'праздничный', 'летний', 'овощной', 'пряный', 'сладкий',
+)
+QUERIES = (
+    'борщ', 'суп с грибами', 'запечённая курица', 'сырный пирог',
+    'шоколадный десерт', 'салат овощной', 'котлета', 'блины творог',
+    'борш', 'курыца', 'шоколат',
+)
+
+
+SEARCH_INDEXES = ('recipe_search_vector_idx', 'recipe_name_trgm_idx')
+
+
+def find_indexes(plan):
+    """Возвращает имена индексов, которые читает план запроса."""
+    names = {plan['Index Name']} if 'Index Name' in plan else set()
+    for child in plan.get('Plans', ()):
+        names |= find_indexes(child)
+    return names
+
+
+class Command(BaseCommand):
+    """
+    Замеряет поиск рецептов на синтетической таблице рецептов.
+
+    Для каждого запроса выводит задержку поиска и ILIKE, а также
+    поисковые индексы, которые выбрал планировщик. С --explain
+    печатает полный EXPLAIN ANALYZE.
+    """
+
+    help = 'Замеряет полнотекстовый поиск рецептов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--recipes', type=int, default=100_000,
+            help='Количество синтетических рецептов'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Количество повторов каждого запроса'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Зерно генератора синтетических данных'
+        )
+        parser.add_argument(
+            '--explain', action='store_true',
+            help='Вывести EXPLAIN ANALYZE каждого поискового запроса'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Поиск по рецептам требует PostgreSQL')
+
+        # Синтетические данные откатываются вместе с транзакцией.
+        with transaction.atomic():
+            self._create_recipes(options['recipes'], options['seed'])
+            with connection.cursor() as cursor:
+                cursor.execute(f'ANALYZE {Recipe._meta.db_table}')
+            self._run(options['repeat'], options['explain'])
+            transaction.set_rollback(True)
+
+    def _create_recipes(self, count, seed):
+        rng = random.Random(seed)
+        author = User.objects.create_user(
+            email='benchmark@foodgram.local', username='benchmark',
+            first_name='Benchmark', last_name='Benchmark'
+        )
+        batch = []
+        for number in range(count):
+            batch.append(Recipe(
+                author=author,
+                name=' '.join(rng.choices(WORDS, k=3)).capitalize(),
+                text=' '.join(rng.choices(WORDS, k=40)),
+                image='recipes/images/benchmark.png',
+                cooking_time=rng.randint(5, 180),
+            ))
+            if len(batch) == 5000 or number == count - 1:
+                Recipe.objects.bulk_create(batch)
+                batch = []
+        self.stdout.write(f'Создано рецептов: {count}')
+
+    def _run(self, repeat, explain):
+        base = Recipe.objects.defer('search_vector')
+        for query in QUERIES:
+            searched = RecipeFilter(
+                {'search': query}, queryset=base
+            ).qs.order_by('-search_rank', '-pub_date')[:6]
+
+            def full_text():
+                return list(searched.all())
+
+            def substring():
+                return list(base.filter(name__icontains=query)[:6])
+
+            self.stdout.write(format_summary(
+                f'"{query}" поиск', summarize(measure(full_text, repeat))
+            ))
+            self.stdout.write(format_summary(
+                f'"{query}" ILIKE', summarize(measure(substring, repeat))
+            ))
+            plan = json.loads(searched.explain(format='json'))[0]['Plan']
+            indexes = find_indexes(plan) & set(SEARCH_INDEXES)
+            self.stdout.write(
+                f'"{query}" индексы: '
+                + (', '.join(sorted(indexes)) or 'не используются')
+            )
+            if explain:
+                self.stdout.write(searched.explain(analyze=True))
@@ -0,0 +1,60 @@
+from api.serializers import RecipeReadSerializer, RecipeSerializer
+from api.views import RecipeViewSet
+from core.benchmark import format_summary, measure, summarize
+from django.contrib.auth.models import AnonymousUser
+from django.core.management import BaseCommand
+from django.db import transaction
+from recipes.benchmark import create_recipes
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+PAGE_SIZES = (6, 50, 200)
+
+
+class Command(BaseCommand):
+    """Сравнивает скорость RecipeSerializer и RecipeReadSerializer."""
+
+    help = 'Замеряет сериализацию страниц списка рецептов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=PAGE_SIZES,
+            help='Размеры страниц'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=50,
+            help='Количество повторов для каждой страницы'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Зерно генератора синтетических данных'
+        )
+
+    def handle(self, *args, **options):
+        # Синтетические данные откатываются вместе с транзакцией.
+        with transaction.atomic():
+            _, viewer = create_recipes(max(options['sizes']), options['seed'])
+            for user in (AnonymousUser(), viewer):
+                self._run(user, options['sizes'], options['repeat'])
+            transaction.set_rollback(True)
+
+    def _run(self, user, sizes, repeat):
+        request = Request(APIRequestFactory().get('/api/recipes/'))
+        request.user = user
+        view = RecipeViewSet(
+            request=request, action='list', format_kwarg=None, kwargs={}
+        )
+        context = {'request': request, 'view': view}
+        title = 'аноним' if user.is_anonymous else 'пользователь'
+        for size in sizes:
+            page = list(view.get_queryset().order_by('-pub_date')[:size])
+            for serializer_class in (RecipeSerializer, RecipeReadSerializer):
+                def serialize():
+                    return serializer_class(
+                        page, many=True, context=context
+                    ).data
+
+                self.stdout.write(format_summary(
+                    f'{title}, {size} рецептов, {serializer_class.__name__}',
+                    summarize(measure(serialize, repeat))
+                ))
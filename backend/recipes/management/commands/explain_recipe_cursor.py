@@ -0,0 +1,87 @@
+import json
+
+from api.pagination import CustomPagination
+from core.benchmark import format_summary, measure, summarize
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+from recipes.benchmark import create_recipes
+from recipes.models import Recipe
+
+CURSOR_ORDERING = ('-pub_date', '-id')
+INDEX_NAME = 'recipe_pub_date_id_idx'
+
+
+def find_index_scans(plan):
+    """Возвращает все узлы плана, читающие заданный индекс."""
+    nodes = [plan] if plan.get('Index Name') == INDEX_NAME else []
+    for child in plan.get('Plans', ()):
+        nodes.extend(find_index_scans(child))
+    return nodes
+
+
+class Command(BaseCommand):
+    """
+    Проверяет план запроса страницы рецептов по курсору.
+
+    Для страницы в глубине синтетической таблицы условие курсора должно
+    попасть в Index Cond индекса (pub_date, id), то есть индекс
+    читается с позиции курсора, а не просматривается с начала.
+    Выводит EXPLAIN ANALYZE и сравнивает задержку первой и глубокой
+    страниц.
+    """
+
+    help = 'Проверяет план запроса пагинации рецептов курсором'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--recipes', type=int, default=100_000,
+            help='Количество синтетических рецептов'
+        )
+        parser.add_argument(
+            '--limit', type=int, default=6, help='Размер страницы'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Количество повторов каждого запроса'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Проверка плана запроса требует PostgreSQL')
+
+        # Синтетические данные откатываются вместе с транзакцией.
+        with transaction.atomic():
+            create_recipes(options['recipes'])
+            with connection.cursor() as cursor:
+                cursor.execute(f'ANALYZE {Recipe._meta.db_table}')
+            self._run(options['limit'], options['repeat'])
+            transaction.set_rollback(True)
+
+    def _run(self, limit, repeat):
+        pagination = CustomPagination()
+        pagination.cursor_ordering = CURSOR_ORDERING
+        base = Recipe.objects.order_by(*CURSOR_ORDERING)
+        deep = base[base.count() * 9 // 10]
+        condition = pagination._decode_cursor(
+            base, pagination._encode_cursor(deep)
+        )
+        page = base.filter(condition)[:limit + 1]
+
+        plan = json.loads(page.explain(format='json'))[0]['Plan']
+        scans = [
+            node for node in find_index_scans(plan)
+            if 'pub_date' in node.get('Index Cond', '')
+        ]
+        if not scans:
+            raise CommandError(
+                f'Условие курсора не попало в Index Cond индекса {INDEX_NAME}'
+            )
+        self.stdout.write(page.explain(analyze=True))
+        self.stdout.write(format_summary(
+            'первая страница',
+            summarize(measure(lambda: list(base[:limit + 1]), repeat))
+        ))
+        self.stdout.write(format_summary(
+            'страница на 90%',
+            summarize(measure(lambda: list(page), repeat))
+        ))
@@ -0,0 +1,95 @@
+from collections import defaultdict
+
+from api.filters import TAGS_MATCH_ALL, TAGS_MATCH_ANY, RecipeFilter
+from core.benchmark import format_summary, measure, summarize
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+from recipes.benchmark import create_recipes
+from recipes.models import Recipe
+
+SLUGS = ('benchmark-0', 'benchmark-1')
+
+
+class Command(BaseCommand):
+    """
+    Проверяет план запроса фильтра по тегам на большой таблице рецептов.
+
+    Для режимов any и all проверяется, что SQL использует EXISTS без
+    DISTINCT, результат не содержит дублей и совпадает с выборкой,
+    посчитанной по промежуточной таблице. Выводит EXPLAIN ANALYZE и
+    сравнивает задержку с прежним JOIN + DISTINCT.
+    """
+
+    help = 'Проверяет план запроса фильтра рецептов по тегам'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--recipes', type=int, default=100_000,
+            help='Количество синтетических рецептов'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Количество повторов каждого запроса'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Зерно генератора синтетических данных'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Проверка плана запроса требует PostgreSQL')
+
+        # Синтетические данные откатываются вместе с транзакцией.
+        with transaction.atomic():
+            create_recipes(options['recipes'], seed=options['seed'])
+            with connection.cursor() as cursor:
+                for model in (Recipe, Recipe.tags.through):
+                    cursor.execute(f'ANALYZE {model._meta.db_table}')
+            self._run(options['repeat'])
+            transaction.set_rollback(True)
+
+    def _expected(self):
+        tags_by_recipe = defaultdict(set)
+        for recipe_id, slug in Recipe.tags.through.objects.filter(
+            tag__slug__in=SLUGS
+        ).values_list('recipe_id', 'tag__slug'):
+            tags_by_recipe[recipe_id].add(slug)
+        return {
+            TAGS_MATCH_ANY: set(tags_by_recipe),
+            TAGS_MATCH_ALL: {
+                recipe_id for recipe_id, slugs in tags_by_recipe.items()
+                if len(slugs) == len(SLUGS)
+            },
+        }
+
+    def _run(self, repeat):
+        expected = self._expected()
+        base = Recipe.objects.order_by('-pub_date')
+        for mode in (TAGS_MATCH_ANY, TAGS_MATCH_ALL):
+            queryset = RecipeFilter(
+                {'tags': list(SLUGS), 'tags_match': mode}, queryset=base
+            ).qs
+            sql = str(queryset.query).upper()
+            if 'EXISTS' not in sql or 'DISTINCT' in sql:
+                raise CommandError(f'{mode}: запрос без EXISTS или с DISTINCT')
+            ids = list(queryset.values_list('id', flat=True))
+            if len(ids) != len(set(ids)):
+                raise CommandError(f'{mode}: в результате есть дубли')
+            if set(ids) != expected[mode]:
+                raise CommandError(
+                    f'{mode}: найдено {len(ids)} рецептов, '
+                    f'ожидалось {len(expected[mode])}'
+                )
+            self.stdout.write(f'{mode}: {len(ids)} рецептов')
+            self.stdout.write(queryset.explain(analyze=True))
+            self.stdout.write(format_summary(
+                f'{mode} EXISTS',
+                summarize(measure(lambda: list(queryset[:6]), repeat))
+            ))
+
+        joined = base.filter(tags__slug__in=SLUGS).distinct()
+        self.stdout.write(format_summary(
+            f'{TAGS_MATCH_ANY} JOIN + DISTINCT',
+            summarize(measure(lambda: list(joined[:6]), repeat))
+        ))
@@ -0,0 +1,219 @@
+import random
+from itertools import accumulate, islice
+
+from core.cache import invalidate
+from core.constants import RECIPES_CACHE_NAMESPACE, TAGS_CACHE_NAMESPACE
+from django.contrib.auth.hashers import make_password
+from django.core.management import BaseCommand, CommandError, call_command
+from django.db import transaction
+from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
+                            ShoppingCart, Tag)
+from users.models import Subscription, User
+
+DEFAULT_TAGS = (
+    ('Завтрак', 'breakfast'), ('Обед', 'lunch'), ('Ужин', 'dinner'),
+    ('Десерт', 'dessert'), ('Выпечка', 'baking'), ('Салат', 'salad'),
+)
+WORDS = (
+    'борщ', 'суп', 'салат', 'пирог', 'котлеты', 'картофель', 'курица',
+    'говядина', 'рыба', 'грибы', 'сыр', 'томаты', 'тыква', 'шоколад',
+    'запечённый', 'жареный', 'домашний', 'острый', 'быстрый', 'летний',
+)
+
+
+def zipf_weights(count, exponent):
+    """Накопленные веса распределения Ципфа для count элементов."""
+    return list(accumulate(
+        1 / rank ** exponent for rank in range(1, count + 1)
+    ))
+
+
+class Command(BaseCommand):
+    """
+    Генерирует синтетический набор данных для нагрузочного тестирования.
+
+    Популярность авторов и рецептов подчиняется закону Ципфа, а размеры
+    избранного, списков покупок и подписок имеют длинный хвост.
+    При одном и том же --seed результат одинаков. Строки пишутся
+    пакетами bulk_create с соблюдением ограничений уникальности
+    и запрета подписки на себя; счётчики и суммы списков покупок
+    пересчитываются в конце.
+    """
+
+    help = 'Генерирует пользователей, рецепты и связи для нагрузочных тестов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--recipes', type=int, default=10000)
+        parser.add_argument(
+            '--favorites', type=float, default=20,
+            help='Среднее число избранных рецептов у пользователя'
+        )
+        parser.add_argument(
+            '--carts', type=float, default=5,
+            help='Среднее число рецептов в списке покупок'
+        )
+        parser.add_argument(
+            '--subscriptions', type=float, default=10,
+            help='Среднее число подписок у пользователя'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--prefix', default='dataset',
+            help='Префикс имён пользователей набора'
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        prefix = options['prefix']
+        if options['users'] < 2 or options['recipes'] < 1:
+            raise CommandError('Нужно минимум 2 пользователя и 1 рецепт')
+        if User.objects.filter(username__startswith=f'{prefix}-').exists():
+            raise CommandError(
+                f'Набор с префиксом {prefix} уже есть, укажите другой --prefix'
+            )
+        ingredient_ids = list(
+            Ingredient.objects.order_by('id').values_list('id', flat=True)
+        )
+        if not ingredient_ids:
+            raise CommandError(
+                'Нет ингредиентов, выполните load_data_ingredients'
+            )
+
+        with transaction.atomic():
+            tag_ids = self._tags()
+            user_ids = self._users(prefix, options['users'])
+            recipe_ids = self._recipes(
+                user_ids, options['recipes'], tag_ids, ingredient_ids
+            )
+            recipe_weights = zipf_weights(len(recipe_ids), 1.1)
+            for model, mean in (
+                (Favorite, options['favorites']),
+                (ShoppingCart, options['carts']),
+            ):
+                self._relations(
+                    model, 'recipe_id', user_ids, recipe_ids,
+                    recipe_weights, mean
+                )
+            self._relations(
+                Subscription, 'author_id', user_ids, user_ids,
+                zipf_weights(len(user_ids), 1.2), options['subscriptions']
+            )
+            call_command('recount_counters', stdout=self.stdout)
+            call_command(
+                'reconcile_shopping_carts', fix=True, stdout=self.stdout
+            )
+            # Рецепты и связи созданы через bulk_create без сигналов,
+            # поэтому кеш ответов по рецептам сбрасывается вручную.
+            invalidate(RECIPES_CACHE_NAMESPACE)
+        self.stdout.write(self.style.SUCCESS('Набор данных создан'))
+
+    def _bulk_create(self, model, objects, label=None):
+        objects = iter(objects)
+        total = 0
+        while True:
+            batch = list(islice(objects, self.batch_size))
+            if not batch:
+                break
+            model.objects.bulk_create(batch)
+            total += len(batch)
+        label = label or model._meta.verbose_name_plural
+        self.stdout.write(f'{label}: {total}')
+
+    def _tags(self):
+        if not Tag.objects.exists():
+            Tag.objects.bulk_create(
+                Tag(name=name, slug=slug) for name, slug in DEFAULT_TAGS
+            )
+            # bulk_create не отправляет сигналы, словарь тегов
+            # сбрасывается вручную.
+            invalidate(TAGS_CACHE_NAMESPACE)
+        return list(Tag.objects.order_by('id').values_list('id', flat=True))
+
+    def _users(self, prefix, count):
+        password = make_password(None)
+        self._bulk_create(User, (
+            User(
+                username=f'{prefix}-{number}',
+                email=f'{prefix}-{number}@foodgram.local',
+                first_name=f'Имя{number}', last_name=f'Фамилия{number}',
+                password=password,
+            )
+            for number in range(count)
+        ))
+        # bulk_create возвращает id только в PostgreSQL.
+        return list(
+            User.objects.filter(username__startswith=f'{prefix}-')
+            .order_by('id').values_list('id', flat=True)
+        )
+
+    def _recipes(self, user_ids, count, tag_ids, ingredient_ids):
+        rng = self.rng
+        author_weights = zipf_weights(len(user_ids), 1.2)
+        authors = rng.choices(user_ids, cum_weights=author_weights, k=count)
+        first_id = (
+            Recipe.objects.order_by('-id').values_list('id', flat=True)
+            .first() or 0
+        )
+        self._bulk_create(Recipe, (
+            Recipe(
+                author_id=author_id,
+                name=' '.join(rng.choices(WORDS, k=3)).capitalize(),
+                text=' '.join(rng.choices(WORDS, k=30)),
+                image='recipes/images/dataset.png',
+                cooking_time=rng.randint(5, 180),
+            )
+            for author_id in authors
+        ))
+        recipe_ids = list(
+            Recipe.objects.filter(id__gt=first_id, author_id__in=user_ids)
+            .order_by('id').values_list('id', flat=True)
+        )
+        self._bulk_create(Recipe.tags.through, (
+            Recipe.tags.through(recipe_id=recipe_id, tag_id=tag_id)
+            for recipe_id in recipe_ids
+            for tag_id in rng.sample(
+                tag_ids, min(len(tag_ids), rng.randint(1, 3))
+            )
+        ), label='Теги рецептов')
+        self._bulk_create(RecipeIngredient, (
+            RecipeIngredient(
+                recipe_id=recipe_id, ingredient_id=ingredient_id,
+                amount=rng.randint(1, 1000)
+            )
+            for recipe_id in recipe_ids
+            for ingredient_id in rng.sample(
+                ingredient_ids, min(len(ingredient_ids), rng.randint(3, 15))
+            )
+        ))
+        return recipe_ids
+
+    def _relations(self, model, field, user_ids, target_ids, weights, mean):
+        """
+        Создаёт связи пользователей с целями, выбранными по весам.
+
+        Размер связи у пользователя берётся из распределения Парето
+        со средним mean, цели не повторяются и не совпадают
+        с самим пользователем.
+        """
+        rng = self.rng
+        limit = len(target_ids) // 2
+        alpha = 1.5
+        scale = mean * (alpha - 1) / alpha
+
+        def rows():
+            for user_id in user_ids:
+                size = min(limit, int(scale * rng.paretovariate(alpha)))
+                chosen = set()
+                while len(chosen) < size:
+                    for target_id in rng.choices(
+                        target_ids, cum_weights=weights, k=size - len(chosen)
+                    ):
+                        if target_id != user_id:
+                            chosen.add(target_id)
+                for target_id in sorted(chosen):
+                    yield model(user_id=user_id, **{field: target_id})
+
+        self._bulk_create(model, rows())
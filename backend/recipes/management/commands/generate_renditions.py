@@ -0,0 +1,75 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from core.images import (AVATAR_RENDITIONS, RECIPE_RENDITIONS,
+                         generate_renditions, mark_renditions_ready)
+from django.core.management import BaseCommand
+from django.db import connections
+from recipes.models import Recipe
+from users.models import User
+
+
+def render(task):
+    """Создаёт копии одного изображения в отдельном процессе."""
+    name, renditions, force = task
+    try:
+        return name, len(generate_renditions(name, renditions, force=force))
+    except (OSError, ValueError) as error:
+        return name, error
+
+
+class Command(BaseCommand):
+    """
+    Создаёт уменьшенные копии уже загруженных изображений.
+
+    После успешной обработки у рецептов и пользователей ставится флаг
+    готовности копий, по которому API начинает отдавать их адреса.
+    """
+
+    help = 'Создаёт уменьшенные копии изображений рецептов и аватаров'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help='Число процессов (по умолчанию — число ядер)'
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Пересоздать уже существующие копии'
+        )
+
+    def handle(self, *args, **options):
+        force = options['force']
+        recipe_images = set(
+            Recipe.objects.exclude(image='')
+            .values_list('image', flat=True).iterator()
+        )
+        avatars = set(
+            User.objects.exclude(avatar='').exclude(avatar=None)
+            .values_list('avatar', flat=True).iterator()
+        )
+        tasks = [
+            (name, RECIPE_RENDITIONS, force) for name in recipe_images
+        ] + [(name, AVATAR_RENDITIONS, force) for name in avatars]
+        connections.close_all()
+
+        created = failed = 0
+        done = set()
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            for name, result in pool.map(render, tasks, chunksize=16):
+                if isinstance(result, Exception):
+                    failed += 1
+                    self.stderr.write(f'{name}: {result}')
+                else:
+                    created += result
+                    done.add(name)
+        for model, field, names in (
+            ('recipes.Recipe', 'image', recipe_images & done),
+            ('users.User', 'avatar', avatars & done),
+        ):
+            names = list(names)
+            for start in range(0, len(names), 1000):
+                mark_renditions_ready(model, field, names[start:start + 1000])
+        self.stdout.write(self.style.SUCCESS(
+            f'Изображений: {len(tasks)}, создано копий: {created}, '
+            f'ошибок: {failed}'
+        ))
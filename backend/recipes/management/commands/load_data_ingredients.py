@@ -1,40 +1,249 @@
 import csv
+import io
+import json
 import logging
+from itertools import islice
 from pathlib import Path
 
+from core.cache import bump_cache_version
+from core.constants import INGREDIENTS_CACHE_NAMESPACE
 from django.conf import settings
-from django.core.management import BaseCommand
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
 from recipes.models import Ingredient
 
 logger = logging.getLogger(__name__)
 
+FORMATS = ('csv', 'json')
+STAGING_TABLE = 'ingredient_import'
+JSON_CHUNK_SIZE = 64 * 1024
+DRY_RUN_EXAMPLES = 10
+
+
+def iter_json_array(file, chunk_size=JSON_CHUNK_SIZE):
+    """
+    По одному отдаёт элементы JSON-массива, не читая файл целиком.
+
+    Файл читается блоками, элементы разбираются по одному через
+    JSONDecoder.raw_decode, поэтому в памяти держится только текущий
+    блок, а не весь список ингредиентов.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    started = False
+    exhausted = False
+    while True:
+        while position < len(buffer) and buffer[position] in ' \t\r\n,':
+            position += 1
+        if not started and position < len(buffer):
+            if buffer[position] != '[':
+                raise ValueError('Ожидался JSON-массив')
+            started = True
+            position += 1
+            continue
+        if started and buffer[position:position + 1] == ']':
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if exhausted:
+                raise
+        else:
+            # Число на границе блока может быть обрезано: дочитываем.
+            if end < len(buffer) or exhausted:
+                yield item
+                position = end
+                continue
+        chunk = file.read(chunk_size)
+        exhausted = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
+        if exhausted and not buffer.strip():
+            raise ValueError('JSON-массив не закрыт')
+
 
 class Command(BaseCommand):
-    """Команда для загрузки ингредиентов в базу данных."""
+    """
+    Команда для загрузки ингредиентов в базу данных.
 
-    help = 'Загружает ингредиенты в БД'
+    Загрузка идемпотентна: существующие ингредиенты не удаляются
+    и не дублируются, поэтому команду можно повторять на рабочей базе.
+    В PostgreSQL строки передаются через COPY во временную таблицу
+    и переносятся одним INSERT ... ON CONFLICT DO NOTHING. Пробный
+    запуск ничего не пишет в таблицу ингредиентов: новые строки
+    считаются через EXCEPT с временной таблицей.
+    """
 
-    def handle(self, *args, **options):
-        """Выполняет загрузку ингредиентов из CSV-файла."""
-        file_path = Path(settings.BASE_DIR) / 'data' / 'ingredients.csv'
+    help = 'Загружает ингредиенты в БД'
 
-        Ingredient.objects.all().delete()
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', type=Path,
+            default=Path(settings.BASE_DIR) / 'data' / 'ingredients.csv',
+            help='Файл с ингредиентами'
+        )
+        parser.add_argument(
+            '--format', choices=FORMATS, default=None,
+            help='Формат файла (по умолчанию — по расширению)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=10000,
+            help='Размер пакета строк'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Показать изменения, не записывая их'
+        )
 
-        ingredients_to_create = []
+    def handle(self, *args, **options):
+        """Выполняет загрузку ингредиентов из CSV- или JSON-файла."""
+        path = options['path']
+        file_format = options['format'] or path.suffix.lstrip('.').lower()
+        if file_format not in FORMATS:
+            raise CommandError(
+                f'Неизвестный формат файла: {file_format}. '
+                f'Укажите --format {"/".join(FORMATS)}'
+            )
+        if not path.exists():
+            raise CommandError(f'Файл не найден: {path}')
 
-        with open(file_path, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            for row in reader:
-                ingredients_to_create.append(
-                    Ingredient(
-                        name=row[0],
-                        measurement_unit=row[1]
-                    )
+        rows = self.read_rows(path, file_format)
+        load = (
+            self.load_postgresql if connection.vendor == 'postgresql'
+            else self.load_batches
+        )
+        dry_run = options['dry_run']
+        try:
+            with transaction.atomic():
+                created, existing, examples = load(
+                    rows, options['batch_size'], dry_run
                 )
+                total = Ingredient.objects.count()
+                if not dry_run:
+                    transaction.on_commit(
+                        lambda: bump_cache_version(INGREDIENTS_CACHE_NAMESPACE)
+                    )
+        except ValueError as error:
+            raise CommandError(f'Некорректный файл {path}: {error}')
 
-        Ingredient.objects.bulk_create(ingredients_to_create)
+        if dry_run:
+            self.stdout.write(
+                f'Будет добавлено: {created}, уже есть: {existing}, '
+                f'нет в файле (останутся): {total - existing}'
+            )
+            for name, unit in examples:
+                self.stdout.write(f'+ {name}, {unit}')
+            if created > len(examples):
+                self.stdout.write(f'... и ещё {created - len(examples)}')
+            return
 
-        logger.info(f'Загружено {len(ingredients_to_create)} ингредиентов')
+        logger.info(f'Загружено {created} ингредиентов')
         self.stdout.write(self.style.SUCCESS(
-            f'Загружено {len(ingredients_to_create)} ингредиентов'
+            f'Загружено {created} ингредиентов, уже были: {existing}, '
+            f'всего: {total}'
         ))
+
+    def read_rows(self, path, file_format):
+        """Построчно читает файл, пропуская пустые и слишком длинные."""
+        name_length = Ingredient._meta.get_field('name').max_length
+        unit_length = Ingredient._meta.get_field(
+            'measurement_unit'
+        ).max_length
+        with open(path, encoding='utf-8') as file:
+            if file_format == 'csv':
+                items = (row[:2] for row in csv.reader(file) if len(row) >= 2)
+            else:
+                items = (
+                    (item.get('name'), item.get('measurement_unit'))
+                    for item in iter_json_array(file)
+                )
+            for name, unit in items:
+                name, unit = (name or '').strip(), (unit or '').strip()
+                if not name or not unit:
+                    continue
+                if len(name) > name_length or len(unit) > unit_length:
+                    self.stderr.write(f'Пропущено: {name}, {unit}')
+                    continue
+                yield name, unit
+
+    def load_postgresql(self, rows, batch_size, dry_run):
+        """Загружает строки через COPY во временную таблицу."""
+        table = Ingredient._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TEMPORARY TABLE {STAGING_TABLE} '
+                '(name text, measurement_unit text) ON COMMIT DROP'
+            )
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(batch)
+                buffer.seek(0)
+                cursor.copy_expert(
+                    f'COPY {STAGING_TABLE} (name, measurement_unit) '
+                    'FROM STDIN WITH (FORMAT csv)',
+                    buffer
+                )
+            cursor.execute(
+                f'SELECT count(*) FROM (SELECT DISTINCT name, '
+                f'measurement_unit FROM {STAGING_TABLE}) AS staged '
+                f'JOIN {table} AS ingredient USING (name, measurement_unit)'
+            )
+            existing = cursor.fetchone()[0]
+            new_rows = (
+                f'SELECT name, measurement_unit FROM {STAGING_TABLE} '
+                f'EXCEPT SELECT name, measurement_unit FROM {table}'
+            )
+            if dry_run:
+                cursor.execute(
+                    f'SELECT count(*) FROM ({new_rows}) AS new_rows'
+                )
+                created = cursor.fetchone()[0]
+                cursor.execute(
+                    f'{new_rows} ORDER BY name, measurement_unit LIMIT %s',
+                    [DRY_RUN_EXAMPLES]
+                )
+                examples = cursor.fetchall()
+            else:
+                cursor.execute(
+                    f'INSERT INTO {table} (name, measurement_unit) '
+                    f'{new_rows} '
+                    'ON CONFLICT (name, measurement_unit) DO NOTHING'
+                )
+                created = cursor.rowcount
+                examples = []
+        return created, existing, examples
+
+    def load_batches(self, rows, batch_size, dry_run):
+        """Загружает строки пакетами bulk_create для других СУБД."""
+        seen = set()
+        created = existing = 0
+        examples = []
+        while True:
+            chunk = list(islice(rows, batch_size))
+            if not chunk:
+                break
+            batch = set(chunk) - seen
+            seen |= batch
+            present = set(
+                Ingredient.objects.filter(
+                    name__in={name for name, _ in batch}
+                ).values_list('name', 'measurement_unit')
+            ) & batch
+            existing += len(present)
+            new = batch - present
+            created += len(new)
+            if dry_run:
+                examples = sorted([*examples, *new])[:DRY_RUN_EXAMPLES]
+                continue
+            Ingredient.objects.bulk_create(
+                [
+                    Ingredient(name=name, measurement_unit=unit)
+                    for name, unit in new
+                ],
+                ignore_conflicts=True
+            )
+        return created, existing, examples
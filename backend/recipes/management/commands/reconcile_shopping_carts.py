@@ -0,0 +1,91 @@
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Sum
+from recipes.models import (RecipeIngredient, ShoppingCart,
+                            ShoppingCartIngredient)
+
+
+class Command(BaseCommand):
+    """Сверяет накопленные суммы списков покупок с исходными данными."""
+
+    help = 'Проверяет и исправляет суммы ингредиентов в списках покупок'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix', action='store_true',
+            help='Исправить найденные расхождения'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Количество пользователей, сверяемых за один проход'
+        )
+
+    def handle(self, *args, **options):
+        user_ids = sorted(
+            set(ShoppingCart.objects.values_list('user_id', flat=True))
+            | set(ShoppingCartIngredient.objects.values_list(
+                'user_id', flat=True
+            ))
+        )
+        batch_size = options['batch_size']
+        mismatches = 0
+        for start in range(0, len(user_ids), batch_size):
+            mismatches += self._reconcile(
+                user_ids[start:start + batch_size], options['fix']
+            )
+
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS('Расхождений не найдено'))
+        elif options['fix']:
+            self.stdout.write(self.style.SUCCESS(
+                f'Исправлено расхождений: {mismatches}'
+            ))
+        else:
+            raise CommandError(
+                f'Найдено расхождений: {mismatches}, '
+                'запустите команду с --fix'
+            )
+
+    def _reconcile(self, user_ids, fix):
+        expected = {
+            (row['recipe__shoppingcart_by__user_id'], row['ingredient_id']):
+                row['total']
+            for row in RecipeIngredient.objects.filter(
+                recipe__shoppingcart_by__user_id__in=user_ids
+            ).values(
+                'recipe__shoppingcart_by__user_id', 'ingredient_id'
+            ).annotate(total=Sum('amount')).order_by()
+        }
+        actual = {
+            (total.user_id, total.ingredient_id): total
+            for total in ShoppingCartIngredient.objects.filter(
+                user_id__in=user_ids
+            )
+        }
+
+        to_create = [
+            ShoppingCartIngredient(
+                user_id=user_id, ingredient_id=ingredient_id, amount=amount
+            )
+            for (user_id, ingredient_id), amount in expected.items()
+            if (user_id, ingredient_id) not in actual
+        ]
+        to_update = []
+        to_delete = []
+        for key, total in actual.items():
+            if key not in expected:
+                to_delete.append(total.pk)
+            elif total.amount != expected[key]:
+                total.amount = expected[key]
+                to_update.append(total)
+
+        if fix:
+            with transaction.atomic():
+                ShoppingCartIngredient.objects.filter(
+                    pk__in=to_delete
+                ).delete()
+                ShoppingCartIngredient.objects.bulk_update(
+                    to_update, ['amount']
+                )
+                ShoppingCartIngredient.objects.bulk_create(to_create)
+        return len(to_create) + len(to_update) + len(to_delete)
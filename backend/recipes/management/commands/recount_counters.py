@@ -0,0 +1,46 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from recipes.models import Favorite, Recipe, ShoppingCart
+from users.models import Subscription, User
+
+
+def count_relations(model, field):
+    """Подзапрос с числом связей model, ссылающихся на строку по field."""
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef('pk')}).order_by()
+            .values(field).annotate(total=Count('pk')).values('total')
+        ),
+        Value(0)
+    )
+
+
+COUNTERS = (
+    (Recipe, 'favorites_count', Favorite, 'recipe'),
+    (Recipe, 'shopping_carts_count', ShoppingCart, 'recipe'),
+    (User, 'recipes_count', Recipe, 'author'),
+    (User, 'subscribers_count', Subscription, 'author'),
+)
+
+
+class Command(BaseCommand):
+    """Пересчитывает денормализованные счётчики рецептов и пользователей."""
+
+    help = 'Пересчитывает счётчики избранного, покупок, рецептов и подписок'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            for model, field, relation_model, relation_field in COUNTERS:
+                actual = count_relations(relation_model, relation_field)
+                fixed = model.objects.annotate(
+                    actual_count=actual
+                ).exclude(
+                    **{field: F('actual_count')}
+                ).update(**{field: actual})
+                self.stdout.write(
+                    f'{model._meta.verbose_name_plural}.{field}: '
+                    f'исправлено {fixed}'
+                )
+        self.stdout.write(self.style.SUCCESS('Счётчики пересчитаны'))
@@ -0,0 +1,198 @@
+import json
+from pathlib import Path
+
+from core.benchmark import format_summary, measure, summarize
+from core.cache import bump_cache_version
+from core.constants import RECIPES_CACHE_NAMESPACE
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from recipes.benchmark import create_recipes
+from recipes.models import Favorite, Recipe, ShoppingCart, Tag
+from rest_framework.test import APIClient
+from users.models import Subscription
+
+BASELINE_PATH = Path(settings.BASE_DIR) / 'data' / 'benchmark_baseline.json'
+ISOLATED_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'benchmarks',
+    }
+}
+# Эндпоинты, которые замеряются на попадании в кеш: перед подсчётом
+# запросов выполняется прогревающий вызов.
+WARM_ENDPOINTS = ('recipe_list_anonymous_hit',)
+
+
+class Command(BaseCommand):
+    """
+    Замеряет основные эндпоинты API и проверяет бюджеты SQL-запросов.
+
+    Данные создаются в транзакции, которая откатывается, а кеш
+    подменяется отдельным, поэтому команда не меняет рабочую базу.
+    Число запросов считается на первом (холодном) вызове, для
+    WARM_ENDPOINTS — на первом после прогрева, и сравнивается с бюджетом
+    из базовой линии; превышение завершает команду ошибкой.
+    Задержки сравниваются с базовой линией только для отчёта.
+    """
+
+    help = 'Замеряет задержку и число SQL-запросов эндпоинтов API'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat', type=int, default=30,
+            help='Количество повторов каждого запроса'
+        )
+        parser.add_argument(
+            '--recipes', type=int, default=300,
+            help='Количество синтетических рецептов'
+        )
+        parser.add_argument(
+            '--baseline', type=Path, default=BASELINE_PATH,
+            help='Файл базовой линии'
+        )
+        parser.add_argument(
+            '--update-baseline', action='store_true',
+            help='Записать результаты как новую базовую линию'
+        )
+
+    def handle(self, *args, **options):
+        if options['update_baseline'] and connection.vendor != 'postgresql':
+            raise CommandError(
+                'Базовая линия записывается только на PostgreSQL: '
+                'задержки других СУБД несравнимы с рабочими'
+            )
+        overrides = override_settings(
+            CACHES=ISOLATED_CACHES,
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+        )
+        # Синтетические данные откатываются вместе с транзакцией.
+        with overrides, transaction.atomic():
+            cache.clear()
+            endpoints = self._prepare(options['recipes'])
+            results = {
+                name: self._measure(
+                    request, options['repeat'], name in WARM_ENDPOINTS
+                )
+                for name, request in endpoints
+            }
+            transaction.set_rollback(True)
+
+        if options['update_baseline']:
+            options['baseline'].write_text(
+                json.dumps(results, indent=2, ensure_ascii=False) + '\n',
+                encoding='utf-8'
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f'Базовая линия записана в {options["baseline"]}'
+            ))
+            return
+        self._compare(results, options['baseline'])
+
+    def _prepare(self, count):
+        authors, viewer = create_recipes(count, authors=10)
+        recipes = list(
+            Recipe.objects.order_by('-pub_date').values_list('id', flat=True)
+        )
+        for model in (Favorite, ShoppingCart):
+            model.objects.bulk_create(
+                model(user=viewer, recipe_id=recipe_id)
+                for recipe_id in recipes[:20]
+            )
+            model.on_relations_created(viewer.id, recipes[:20])
+        Subscription.objects.bulk_create(
+            Subscription(user=viewer, author=author) for author in authors
+        )
+        tags = Tag.objects.filter(
+            slug__startswith='benchmark-'
+        ).values_list('slug', flat=True)[:2]
+        tag_query = '&'.join(f'tags={slug}' for slug in tags)
+
+        user, anonymous = APIClient(), APIClient()
+        user.force_authenticate(viewer)
+        detail = recipes[len(recipes) // 2]
+        toggled = recipes[-1]
+
+        def anonymous_list():
+            return anonymous.get(f'/api/recipes/?limit=6&{tag_query}')
+
+        def anonymous_list_miss():
+            # Новая версия пространства имён — промах кеша ответов.
+            bump_cache_version(RECIPES_CACHE_NAMESPACE)
+            return anonymous_list()
+
+        def favorite_toggle():
+            user.post(f'/api/recipes/{toggled}/favorite/')
+            return user.delete(f'/api/recipes/{toggled}/favorite/')
+
+        return (
+            ('recipe_list', lambda: user.get('/api/recipes/?limit=6')),
+            ('recipe_list_filtered', lambda: user.get(
+                f'/api/recipes/?limit=6&is_favorited=1&{tag_query}'
+            )),
+            ('recipe_list_anonymous_miss', anonymous_list_miss),
+            ('recipe_list_anonymous_hit', anonymous_list),
+            ('recipe_detail', lambda: user.get(f'/api/recipes/{detail}/')),
+            ('subscriptions', lambda: user.get(
+                '/api/users/subscriptions/?recipes_limit=3'
+            )),
+            ('ingredient_search', lambda: anonymous.get(
+                '/api/ingredients/?name=bench'
+            )),
+            ('shopping_list', lambda: user.get(
+                '/api/recipes/download_shopping_cart/'
+            )),
+            ('favorite_toggle', favorite_toggle),
+        )
+
+    def _measure(self, request, repeat, warm=False):
+        def run():
+            response = request()
+            if response.status_code >= 400:
+                raise CommandError(
+                    f'{response.status_code}: {response.content[:200]}'
+                )
+            if response.streaming:
+                b''.join(response.streaming_content)
+
+        if warm:
+            run()
+        # Журнал запросов очищается в начале каждого запроса,
+        # поэтому число запросов читаем до повторных вызовов.
+        with CaptureQueriesContext(connection) as queries:
+            run()
+        query_count = len(queries.captured_queries)
+        summary = summarize(measure(run, repeat))
+        return {
+            'queries': query_count,
+            **{key: round(value, 3) for key, value in summary.items()},
+        }
+
+    def _compare(self, results, baseline_path):
+        baseline = {}
+        if baseline_path.exists():
+            baseline = json.loads(baseline_path.read_text(encoding='utf-8'))
+        over_budget = []
+        for name, result in results.items():
+            expected = baseline.get(name, {})
+            budget = expected.get('queries')
+            line = format_summary(name, {
+                key: value for key, value in result.items()
+                if key != 'queries'
+            })
+            line += f' queries={result["queries"]}'
+            if budget is not None:
+                line += f'/{budget}'
+                if result['queries'] > budget:
+                    over_budget.append(name)
+            if expected.get('p95'):
+                ratio = result['p95'] / expected['p95']
+                line += f' p95 к базовой: {ratio:.2f}x'
+            self.stdout.write(line)
+        if over_budget:
+            raise CommandError(
+                'Превышен бюджет SQL-запросов: ' + ', '.join(over_budget)
+            )
+        self.stdout.write(self.style.SUCCESS('Бюджеты запросов соблюдены'))
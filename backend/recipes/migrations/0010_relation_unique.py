@@ -0,0 +1,63 @@
+# Generated by Django 3.2.19 on 2026-10-17 07:09
+
+from django.db import migrations, models
+from django.db.models import Count, F, Min
+
+
+def remove_duplicates(apps, schema_editor):
+    """
+    Удаляет повторные связи перед добавлением ограничения уникальности.
+
+    Счётчики и суммы списка покупок уменьшаются на число удалённых строк,
+    так как при заполнении они учитывали каждую копию.
+    """
+    Recipe = apps.get_model('recipes', 'Recipe')
+    RecipeIngredient = apps.get_model('recipes', 'RecipeIngredient')
+    ShoppingCartIngredient = apps.get_model(
+        'recipes', 'ShoppingCartIngredient'
+    )
+    relations = (
+        ('Favorite', 'favorites_count'),
+        ('ShoppingCart', 'shopping_carts_count'),
+    )
+    for model_name, counter_field in relations:
+        model = apps.get_model('recipes', model_name)
+        duplicates = model.objects.values('user_id', 'recipe_id').annotate(
+            total=Count('id'), keep=Min('id')
+        ).filter(total__gt=1).order_by()
+        for row in duplicates:
+            extra = row['total'] - 1
+            model.objects.filter(
+                user_id=row['user_id'], recipe_id=row['recipe_id']
+            ).exclude(id=row['keep']).delete()
+            Recipe.objects.filter(id=row['recipe_id']).update(
+                **{counter_field: F(counter_field) - extra}
+            )
+            if model_name != 'ShoppingCart':
+                continue
+            amounts = RecipeIngredient.objects.filter(
+                recipe_id=row['recipe_id']
+            ).values_list('ingredient_id', 'amount')
+            for ingredient_id, amount in amounts:
+                ShoppingCartIngredient.objects.filter(
+                    user_id=row['user_id'], ingredient_id=ingredient_id
+                ).update(amount=F('amount') - amount * extra)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0009_auto_20261017_0659'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='favorite',
+            constraint=models.UniqueConstraint(fields=('user', 'recipe'), name='recipes_favorite_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='shoppingcart',
+            constraint=models.UniqueConstraint(fields=('user', 'recipe'), name='recipes_shoppingcart_unique'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 3.2.19 on 2026-10-17 07:43
+
+from core.images import RECIPE_RENDITIONS, rendition_name
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+
+
+def mark_existing(apps, schema_editor):
+    """Ставит флаг строкам, у которых копии уже лежат в хранилище."""
+    Recipe = apps.get_model('recipes', 'Recipe')
+    ready = [
+        name for name in Recipe.objects.exclude(image='').exclude(
+            image=None
+        ).values_list('image', flat=True).iterator()
+        if all(
+            default_storage.exists(rendition_name(name, rendition))
+            for rendition in RECIPE_RENDITIONS
+        )
+    ]
+    for start in range(0, len(ready), 1000):
+        Recipe.objects.filter(
+            image__in=ready[start:start + 1000]
+        ).update(image_renditions_ready=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0010_relation_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='image_renditions_ready',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Копии изображения созданы'),
+        ),
+        migrations.RunPython(mark_existing, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,10 @@
 from core.constants import (MAX_RECIPE_NAME_LENGTH, MAX_SLUG_LENGTH,
                             MAX_TAG_LENGTH)
+from core.counters import CounterFieldsMixin, change_counter
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import connection, models
 from users.models import User
 
 
@@ -39,9 +42,11 @@ class Ingredient(models.Model):
         return f'{self.name}, {self.measurement_unit}'
 
 
-class Recipe(models.Model):
+class Recipe(CounterFieldsMixin, models.Model):
     """Модель рецепта."""
 
+    counter_fields = ('favorites_count', 'shopping_carts_count')
+
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -50,6 +55,9 @@ class Recipe(models.Model):
     )
     name = models.CharField('Название', max_length=MAX_RECIPE_NAME_LENGTH)
     image = models.ImageField('Изображение', upload_to='recipes/images/')
+    image_renditions_ready = models.BooleanField(
+        'Копии изображения созданы', default=False, editable=False
+    )
     text = models.TextField('Описание')
     ingredients = models.ManyToManyField(
         Ingredient,
@@ -70,11 +78,32 @@ class Recipe(models.Model):
         ]
     )
     pub_date = models.DateTimeField('Дата публикации', auto_now_add=True)
+    favorites_count = models.PositiveIntegerField(
+        'В избранном', default=0, editable=False
+    )
+    shopping_carts_count = models.PositiveIntegerField(
+        'В списках покупок', default=0, editable=False
+    )
+    search_vector = SearchVectorField(
+        'Поисковый вектор', null=True, editable=False
+    )
 
     class Meta:
         ordering = ('-pub_date',)
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'], name='recipe_pub_date_id_idx'
+            ),
+            GinIndex(
+                fields=['search_vector'], name='recipe_search_vector_idx'
+            ),
+            GinIndex(
+                fields=['name'], name='recipe_name_trgm_idx',
+                opclasses=['gin_trgm_ops']
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -117,6 +146,8 @@ class RecipeIngredient(models.Model):
 class UserRecipeRelation(models.Model):
     """Абстрактная модель для связи пользователя и рецепта."""
 
+    counter_field = None
+
     user = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -139,11 +170,27 @@ class UserRecipeRelation(models.Model):
             )
         ]
 
+    @classmethod
+    def on_relations_created(cls, user_id, recipe_ids):
+        """Обновляет счётчики рецептов после добавления связей."""
+        change_counter(
+            Recipe.objects.filter(pk__in=recipe_ids), cls.counter_field, 1
+        )
+
+    @classmethod
+    def on_relations_deleted(cls, user_id, recipe_ids):
+        """Обновляет счётчики рецептов после удаления связей."""
+        change_counter(
+            Recipe.objects.filter(pk__in=recipe_ids), cls.counter_field, -1
+        )
+
 
 class Favorite(UserRecipeRelation):
     """Модель для хранения избранных рецептов пользователя."""
 
-    class Meta:
+    counter_field = 'favorites_count'
+
+    class Meta(UserRecipeRelation.Meta):
         verbose_name = 'Избранное'
         verbose_name_plural = 'Избранное'
 
@@ -151,6 +198,118 @@ class Favorite(UserRecipeRelation):
 class ShoppingCart(UserRecipeRelation):
     """Модель для хранения рецептов в списке покупок пользователя."""
 
-    class Meta:
+    counter_field = 'shopping_carts_count'
+
+    class Meta(UserRecipeRelation.Meta):
         verbose_name = 'Список покупок'
         verbose_name_plural = 'Списки покупок'
+
+    @classmethod
+    def on_relations_created(cls, user_id, recipe_ids):
+        super().on_relations_created(user_id, recipe_ids)
+        ShoppingCartIngredient.objects.add_recipes(user_id, recipe_ids)
+
+    @classmethod
+    def on_relations_deleted(cls, user_id, recipe_ids):
+        super().on_relations_deleted(user_id, recipe_ids)
+        ShoppingCartIngredient.objects.remove_recipes(user_id, recipe_ids)
+
+
+class ShoppingCartIngredientManager(models.Manager):
+    """
+    Менеджер инкрементального обновления сумм в списках покупок.
+
+    Все изменения выполняются одним INSERT ... ON CONFLICT DO UPDATE,
+    прибавляющим разницу к уже накопленной сумме.
+    """
+
+    def _add_amounts(self, select_sql, params):
+        table = self.model._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} (user_id, ingredient_id, amount) '
+                f'{select_sql} '
+                'ON CONFLICT (user_id, ingredient_id) DO UPDATE '
+                f'SET amount = {table}.amount + EXCLUDED.amount',
+                params
+            )
+
+    def _change_recipes(self, user_id, recipe_ids, sign):
+        if not recipe_ids:
+            return
+        placeholders = ', '.join(['%s'] * len(recipe_ids))
+        self._add_amounts(
+            'SELECT %s, ingredient_id, SUM(amount) * %s '
+            f'FROM {RecipeIngredient._meta.db_table} '
+            f'WHERE recipe_id IN ({placeholders}) '
+            'GROUP BY ingredient_id',
+            [user_id, sign, *recipe_ids]
+        )
+        if sign < 0:
+            self.filter(user_id=user_id, amount__lte=0).delete()
+
+    def add_recipes(self, user_id, recipe_ids):
+        """Добавляет ингредиенты рецептов в список покупок."""
+        self._change_recipes(user_id, recipe_ids, 1)
+
+    def remove_recipes(self, user_id, recipe_ids):
+        """Вычитает ингредиенты рецептов из списка покупок."""
+        self._change_recipes(user_id, recipe_ids, -1)
+
+    def change_recipe(self, recipe_id, deltas):
+        """
+        Применяет изменение состава рецепта ко всем спискам покупок.
+
+        deltas — словарь {id ингредиента: изменение количества}.
+        """
+        deltas = {
+            ingredient_id: delta
+            for ingredient_id, delta in deltas.items() if delta
+        }
+        if not deltas:
+            return
+        rows = ' UNION ALL '.join(
+            ['SELECT %s AS ingredient_id, %s AS amount'] * len(deltas)
+        )
+        params = [value for item in deltas.items() for value in item]
+        cart_table = ShoppingCart._meta.db_table
+        self._add_amounts(
+            'SELECT cart.user_id, delta.ingredient_id, delta.amount '
+            f'FROM {cart_table} AS cart, ({rows}) AS delta '
+            'WHERE cart.recipe_id = %s',
+            [*params, recipe_id]
+        )
+        if any(delta < 0 for delta in deltas.values()):
+            self.filter(
+                user__shoppingcart__recipe_id=recipe_id, amount__lte=0
+            ).delete()
+
+
+class ShoppingCartIngredient(models.Model):
+    """Суммарное количество ингредиента в списке покупок пользователя."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='shopping_cart_ingredients',
+        verbose_name='Пользователь'
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.CASCADE,
+        related_name='shopping_cart_totals',
+        verbose_name='Ингредиент'
+    )
+    amount = models.IntegerField('Количество')
+
+    objects = ShoppingCartIngredientManager()
+
+    class Meta:
+        verbose_name = 'Сумма ингредиента в списке покупок'
+        verbose_name_plural = 'Суммы ингредиентов в списках покупок'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'ingredient'],
+                name='unique_shopping_cart_ingredient'
+            )
+        ]
@@ -0,0 +1,86 @@
+import threading
+from bisect import bisect_left
+
+from core.cache import get_cache_version
+from core.constants import INGREDIENT_SEARCH_LIMIT, INGREDIENTS_CACHE_NAMESPACE
+
+from .models import Ingredient
+
+
+class IngredientSearchIndex:
+    """
+    Поисковый индекс ингредиентов в памяти процесса.
+
+    Хранит уже сериализованные ингредиенты, отсортированные по названию
+    в нижнем регистре. Совпадения по началу названия ищутся бинарным
+    поиском и идут первыми, совпадения по подстроке добавляются после.
+    """
+
+    def __init__(self, ingredients, version=None):
+        self.version = version
+        self._items = sorted(
+            (
+                {
+                    'id': ingredient_id,
+                    'name': name,
+                    'measurement_unit': measurement_unit,
+                }
+                for ingredient_id, name, measurement_unit in ingredients
+            ),
+            key=lambda item: (item['name'].casefold(), item['id'])
+        )
+        self._keys = [item['name'].casefold() for item in self._items]
+
+    @classmethod
+    def from_database(cls, version=None):
+        """Строит индекс по текущему содержимому таблицы ингредиентов."""
+        return cls(
+            Ingredient.objects.values_list('id', 'name', 'measurement_unit'),
+            version=version
+        )
+
+    def all(self):
+        """Возвращает все ингредиенты в алфавитном порядке."""
+        return self._items
+
+    def search(self, query, limit=INGREDIENT_SEARCH_LIMIT):
+        """Ищет ингредиенты по началу названия, затем по подстроке."""
+        query = query.strip().casefold()
+        if not query:
+            return self._items[:limit]
+
+        start = bisect_left(self._keys, query)
+        end = start
+        while (end < len(self._keys) and end - start < limit
+               and self._keys[end].startswith(query)):
+            end += 1
+        results = self._items[start:end]
+
+        for key, item in zip(self._keys, self._items):
+            if len(results) >= limit:
+                break
+            if query in key and not key.startswith(query):
+                results.append(item)
+        return results
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_ingredient_index():
+    """
+    Возвращает индекс ингредиентов, перестраивая его при смене версии.
+
+    Версия хранится в кеше Django и меняется сигналами при изменении
+    ингредиентов, так что все процессы перестраивают индекс сами.
+    """
+    global _index
+    version = get_cache_version(INGREDIENTS_CACHE_NAMESPACE)
+    index = _index
+    if index is not None and index.version == version:
+        return index
+    with _index_lock:
+        if _index is None or _index.version != version:
+            _index = IngredientSearchIndex.from_database(version=version)
+        return _index
@@ -0,0 +1,65 @@
+from core.cache import invalidate
+from core.constants import (INGREDIENTS_CACHE_NAMESPACE,
+                            RECIPES_CACHE_NAMESPACE, TAGS_CACHE_NAMESPACE)
+from django.db.models.signals import (m2m_changed, post_delete, post_init,
+                                      post_save)
+from django.dispatch import receiver
+from users.models import User
+
+from .models import Ingredient, Recipe, RecipeIngredient, Tag
+
+
+@receiver((post_save, post_delete), sender=Ingredient)
+def invalidate_ingredients(**kwargs):
+    """Сбрасывает закешированные данные ингредиентов."""
+    invalidate(INGREDIENTS_CACHE_NAMESPACE, RECIPES_CACHE_NAMESPACE)
+
+
+@receiver((post_save, post_delete), sender=Tag)
+def invalidate_tags(**kwargs):
+    """Сбрасывает закешированные данные тегов."""
+    invalidate(TAGS_CACHE_NAMESPACE, RECIPES_CACHE_NAMESPACE)
+
+
+@receiver((post_save, post_delete), sender=Recipe)
+@receiver((post_save, post_delete), sender=RecipeIngredient)
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def invalidate_recipes(**kwargs):
+    """Сбрасывает закешированные ответы с рецептами."""
+    invalidate(RECIPES_CACHE_NAMESPACE)
+
+
+AUTHOR_PAYLOAD_FIELDS = (
+    'email', 'username', 'first_name', 'last_name', 'avatar',
+    'avatar_renditions_ready',
+)
+
+
+def author_payload(user):
+    """Значения полей пользователя, которые видны в карточке рецепта."""
+    values = (user.__dict__.get(field) for field in AUTHOR_PAYLOAD_FIELDS)
+    return tuple(getattr(value, 'name', value) for value in values)
+
+
+@receiver(post_init, sender=User)
+def remember_author_payload(instance, **kwargs):
+    """Запоминает поля автора, чтобы после сохранения сравнить их."""
+    instance._author_payload = author_payload(instance)
+
+
+@receiver(post_save, sender=User)
+def invalidate_authors(instance, created, update_fields=None, **kwargs):
+    """
+    Сбрасывает ответы с рецептами при изменении данных автора.
+
+    Регистрация, смена пароля и прочие поля, которых нет в ответе
+    с рецептами, кеш не сбрасывают.
+    """
+    if created or (
+        update_fields and not set(update_fields) & set(AUTHOR_PAYLOAD_FIELDS)
+    ):
+        return
+    payload = author_payload(instance)
+    if payload != instance._author_payload:
+        instance._author_payload = payload
+        invalidate(RECIPES_CACHE_NAMESPACE)
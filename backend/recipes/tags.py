@@ -0,0 +1,28 @@
+import threading
+
+from core.cache import get_cache_version
+from core.constants import TAGS_CACHE_NAMESPACE
+
+from .models import Tag
+
+_tag_ids = None
+_tag_ids_version = None
+_tag_ids_lock = threading.Lock()
+
+
+def get_tag_ids():
+    """
+    Возвращает словарь {slug: id} всех тегов.
+
+    Словарь хранится в памяти процесса и перечитывается из базы только
+    при смене версии кеша тегов, которую меняют сигналы.
+    """
+    global _tag_ids, _tag_ids_version
+    version = get_cache_version(TAGS_CACHE_NAMESPACE)
+    if _tag_ids is not None and _tag_ids_version == version:
+        return _tag_ids
+    with _tag_ids_lock:
+        if _tag_ids is None or _tag_ids_version != version:
+            _tag_ids = dict(Tag.objects.values_list('slug', 'id'))
+            _tag_ids_version = version
+        return _tag_ids
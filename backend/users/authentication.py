@@ -0,0 +1,52 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+TOKEN_KEY_TEMPLATE = 'foodgram:auth-token:{}'
+
+
+def token_cache_key(key):
+    """Ключ кеша токена; сам токен в имени ключа не хранится."""
+    return TOKEN_KEY_TEMPLATE.format(hashlib.sha256(key.encode()).hexdigest())
+
+
+def invalidate_token(key):
+    """Удаляет токен из кеша аутентификации."""
+    cache.delete(token_cache_key(key))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Аутентификация по токену с кешированием пары токен-пользователь.
+
+    Токен вместе с пользователем хранится в кеше Django не дольше
+    AUTH_TOKEN_CACHE_TIMEOUT секунд, поэтому повторные запросы
+    проходят без SQL. Записи удаляются сигналами при выходе, смене
+    пароля, деактивации и любом сохранении пользователя.
+
+    QuerySet.update() сигналов не отправляет: деактивация через
+    User.objects.filter(...).update(is_active=False) (например, массовым
+    действием) или удаление токена через raw SQL начинает действовать
+    только после истечения AUTH_TOKEN_CACHE_TIMEOUT. Для немедленной
+    блокировки сохраняйте пользователей через save() или удаляйте
+    их токены через ORM.
+    """
+
+    def authenticate_credentials(self, key):
+        cache_key = token_cache_key(key)
+        token = cache.get(cache_key)
+        if token is None:
+            user, token = super().authenticate_credentials(key)
+            if settings.AUTH_TOKEN_CACHE_TIMEOUT:
+                cache.set(
+                    cache_key, token, settings.AUTH_TOKEN_CACHE_TIMEOUT
+                )
+        elif not token.user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.')
+            )
+        return token.user, token
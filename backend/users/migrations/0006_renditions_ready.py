@@ -0,0 +1,39 @@
+# Generated by Django 3.2.19 on 2026-10-17 07:43
+
+from core.images import AVATAR_RENDITIONS, rendition_name
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+
+
+def mark_existing(apps, schema_editor):
+    """Ставит флаг строкам, у которых копии уже лежат в хранилище."""
+    User = apps.get_model('users', 'User')
+    ready = [
+        name for name in User.objects.exclude(avatar='').exclude(
+            avatar=None
+        ).values_list('avatar', flat=True).iterator()
+        if all(
+            default_storage.exists(rendition_name(name, rendition))
+            for rendition in AVATAR_RENDITIONS
+        )
+    ]
+    for start in range(0, len(ready), 1000):
+        User.objects.filter(
+            avatar__in=ready[start:start + 1000]
+        ).update(avatar_renditions_ready=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_auto_20261017_0659'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='avatar_renditions_ready',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Копии аватара созданы'),
+        ),
+        migrations.RunPython(mark_existing, migrations.RunPython.noop),
+    ]
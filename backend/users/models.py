@@ -1,4 +1,5 @@
 from core.constants import EMAIL_LENGTH, MAX_FIO_LENGTH, USERNAME_LENGTH
+from core.counters import CounterFieldsMixin, change_counter
 from core.validators import username_validator
 from django.contrib.auth.models import AbstractUser, UserManager
 from django.db import models
@@ -41,9 +42,11 @@ class CustomUserManager(UserManager):
         return self.create_user(email, username, password, **extra_fields)
 
 
-class User(AbstractUser):
+class User(CounterFieldsMixin, AbstractUser):
     """Модель пользователя с дополнительными полями."""
 
+    counter_fields = ('recipes_count', 'subscribers_count')
+
     email = models.EmailField('Почта', unique=True, max_length=EMAIL_LENGTH)
     username = models.CharField(
         'Никнейм',
@@ -59,6 +62,15 @@ class User(AbstractUser):
         blank=True,
         null=True
     )
+    avatar_renditions_ready = models.BooleanField(
+        'Копии аватара созданы', default=False, editable=False
+    )
+    recipes_count = models.PositiveIntegerField(
+        'Рецептов', default=0, editable=False
+    )
+    subscribers_count = models.PositiveIntegerField(
+        'Подписчиков', default=0, editable=False
+    )
 
     REQUIRED_FIELDS = ['username', 'first_name', 'last_name']
     USERNAME_FIELD = 'email'
@@ -103,3 +115,17 @@ class Subscription(models.Model):
                 name='prevent_self_subscription'
             )
         ]
+
+    @classmethod
+    def on_relations_created(cls, user_id, author_ids):
+        """Обновляет счётчики подписчиков после подписки."""
+        change_counter(
+            User.objects.filter(pk__in=author_ids), 'subscribers_count', 1
+        )
+
+    @classmethod
+    def on_relations_deleted(cls, user_id, author_ids):
+        """Обновляет счётчики подписчиков после отписки."""
+        change_counter(
+            User.objects.filter(pk__in=author_ids), 'subscribers_count', -1
+        )
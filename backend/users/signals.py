@@ -0,0 +1,35 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import invalidate_token
+from .models import User
+
+
+def invalidate_tokens(keys):
+    """
+    Удаляет токены из кеша после фиксации транзакции.
+
+    Если удалить запись до COMMIT, параллельный запрос успеет
+    закешировать токен ещё со старыми данными.
+    """
+    for key in keys:
+        transaction.on_commit(partial(invalidate_token, key))
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(instance, **kwargs):
+    """Сбрасывает кеш токена при выходе пользователя."""
+    invalidate_tokens([instance.key])
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_tokens(instance, created, **kwargs):
+    """Сбрасывает кеш токенов при смене пароля, деактивации и правках."""
+    if not created:
+        invalidate_tokens(
+            Token.objects.filter(user=instance).values_list('key', flat=True)
+        )